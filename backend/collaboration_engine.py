@@ -1,187 +1,398 @@
 import sqlite3
 import json
-from typing import List, Dict, Any
+import threading
+import functools
+from typing import List, Dict, Set, Tuple, Any
 from datetime import datetime
 
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:
+    # numba is optional - without it the kernel below runs as plain numpy
+    def njit(*args, **kwargs):
+        if args and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+COMPLEMENTARY_PAIRS = [
+    ('restaurant', 'food_delivery'),
+    ('retail', 'logistics'),
+    ('software', 'consulting'),
+    ('photography', 'real_estate'),
+    ('event_planning', 'catering')
+]
+
+# Both orderings of every pair, for O(1) lookups
+COMPLEMENTARY_SET = frozenset(COMPLEMENTARY_PAIRS) | frozenset((b, a) for a, b in COMPLEMENTARY_PAIRS)
+
+# industry -> industries it pairs with
+COMPLEMENTARY_INDEX = {}
+for _industry, _partner in COMPLEMENTARY_SET:
+    COMPLEMENTARY_INDEX.setdefault(_industry, set()).add(_partner)
+
+# Simplified skill detection based on business type
+SKILL_MAP = {
+    'restaurant': ['culinary', 'customer_service', 'inventory_management'],
+    'technology': ['programming', 'product_development', 'technical_support'],
+    'retail': ['sales', 'merchandising', 'customer_relations'],
+    'consulting': ['strategy', 'analysis', 'client_management'],
+    'creative': ['design', 'content_creation', 'branding']
+}
+SKILL_SETS = {industry: frozenset(skills) for industry, skills in SKILL_MAP.items()}
+NO_SKILLS = frozenset()
+
+CONNECTION_PRAGMAS = '''
+    PRAGMA journal_mode=WAL;
+    PRAGMA synchronous=NORMAL;
+    PRAGMA temp_store=MEMORY;
+    PRAGMA mmap_size=268435456;
+'''
+
+# Indexes behind the candidate prefilter, plus vendor_goals: one row per vendor goal,
+# kept in sync with vendor_profiles.goals by triggers so goals can be loaded without
+# decoding JSON in Python. Invalid JSON, non-lists and nulls contribute no rows. The
+# INSERT backfills vendors created before the triggers existed. vendor_profiles_version
+# is bumped on every vendor write and tells the in-memory match indexes when to
+# rebuild. This is the only definition of these objects; complete_schema.sql defers here
+MATCH_SCHEMA = '''
+    CREATE INDEX IF NOT EXISTS idx_vendor_industry_location ON vendor_profiles(industry, location);
+    CREATE INDEX IF NOT EXISTS idx_vendor_location ON vendor_profiles(location);
+    CREATE INDEX IF NOT EXISTS idx_collab_vendors ON collaborations(vendor1_id, vendor2_id);
+    
+    CREATE TABLE IF NOT EXISTS vendor_goals (
+        vendor_id INTEGER,
+        goal TEXT,
+        PRIMARY KEY (vendor_id, goal)
+    );
+    CREATE INDEX IF NOT EXISTS idx_vendor_goals_goal ON vendor_goals(goal);
+    
+    CREATE TRIGGER IF NOT EXISTS trg_vendor_goals_insert AFTER INSERT ON vendor_profiles
+    BEGIN
+        INSERT OR IGNORE INTO vendor_goals (vendor_id, goal)
+        SELECT NEW.vendor_id, j.value
+        FROM json_each(CASE WHEN json_valid(NEW.goals) THEN NEW.goals ELSE '[]' END) j
+        WHERE typeof(j.key) = 'integer' AND j.value IS NOT NULL;
+    END;
+    
+    CREATE TRIGGER IF NOT EXISTS trg_vendor_goals_update AFTER UPDATE OF vendor_id, goals ON vendor_profiles
+    BEGIN
+        DELETE FROM vendor_goals WHERE vendor_id = OLD.vendor_id;
+        INSERT OR IGNORE INTO vendor_goals (vendor_id, goal)
+        SELECT NEW.vendor_id, j.value
+        FROM json_each(CASE WHEN json_valid(NEW.goals) THEN NEW.goals ELSE '[]' END) j
+        WHERE typeof(j.key) = 'integer' AND j.value IS NOT NULL;
+    END;
+    
+    CREATE TRIGGER IF NOT EXISTS trg_vendor_goals_delete AFTER DELETE ON vendor_profiles
+    BEGIN
+        DELETE FROM vendor_goals WHERE vendor_id = OLD.vendor_id;
+    END;
+    
+    INSERT OR IGNORE INTO vendor_goals (vendor_id, goal)
+    SELECT v.vendor_id, j.value
+    FROM vendor_profiles v, json_each(CASE WHEN json_valid(v.goals) THEN v.goals ELSE '[]' END) j
+    WHERE typeof(j.key) = 'integer' AND j.value IS NOT NULL;
+    
+    CREATE TABLE IF NOT EXISTS vendor_profiles_version (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        version INTEGER NOT NULL
+    );
+    INSERT OR IGNORE INTO vendor_profiles_version (id, version) VALUES (1, 0);
+    
+    CREATE TRIGGER IF NOT EXISTS trg_vendor_version_insert AFTER INSERT ON vendor_profiles
+    BEGIN
+        UPDATE vendor_profiles_version SET version = version + 1 WHERE id = 1;
+    END;
+    
+    CREATE TRIGGER IF NOT EXISTS trg_vendor_version_update AFTER UPDATE ON vendor_profiles
+    BEGIN
+        UPDATE vendor_profiles_version SET version = version + 1 WHERE id = 1;
+    END;
+    
+    CREATE TRIGGER IF NOT EXISTS trg_vendor_version_delete AFTER DELETE ON vendor_profiles
+    BEGIN
+        UPDATE vendor_profiles_version SET version = version + 1 WHERE id = 1;
+    END;
+'''
+
+# collaboration_types bits returned by _score_candidates
+COLLABORATION_TYPE_BITS = (
+    (1, 'cross_promotion'),
+    (2, 'local_partnership'),
+    (4, 'shared_objectives'),
+    (8, 'skill_exchange')
+)
+
+@njit(cache=True)
+def _score_candidates(complementary, same_location, common_goals, skill_exchange):
+    """Match scores and collaboration type bits for int64 candidate columns"""
+    # Industry complementarity (30), location proximity (20),
+    # goal alignment (5 per shared goal), skill complementarity (25)
+    scores = 30 * complementary + 20 * same_location + 5 * common_goals + 25 * skill_exchange
+    type_bits = (complementary + 2 * same_location +
+                 np.where(common_goals > 0, 4, 0) + 8 * skill_exchange)
+    return scores, type_bits
+
+# SQL kept as module constants so each call hands sqlite3 an identical string and
+# hits the connection's statement cache instead of re-parsing
+_SQL_GET_VERSION = 'SELECT version FROM vendor_profiles_version WHERE id = 1'
+
+_SQL_GET_VENDORS = '''
+    SELECT vendor_id, business_name, industry, location, target_audience, budget
+    FROM vendor_profiles
+'''
+
+_SQL_GET_GOALS = 'SELECT vendor_id, goal FROM vendor_goals'
+
+_SQL_INSERT_COLLAB = '''
+    INSERT INTO collaborations
+    (vendor1_id, vendor2_id, collaboration_type, status)
+    VALUES (?, ?, ?, ?)
+'''
+
+# Idea bundles for get_collaboration_ideas, keyed by (industry1, industry2)
+PAIR_IDEAS = {
+    ('restaurant', 'food_delivery'): (
+        'Joint promotion: Free delivery with restaurant purchase',
+        'Co-branded marketing campaign',
+        'Shared customer loyalty program'
+    ),
+    ('retail', 'retail'): (
+        'Cross-promotion in each other\'s stores',
+        'Joint pop-up event',
+        'Bundle deals combining products'
+    )
+}
+LOCAL_IDEAS = (
+    'Co-host local community event',
+    'Joint advertisement in local newspaper',
+    'Shared booth at local fair'
+)
+GENERIC_IDEAS = (
+    'Social media shoutout exchange',
+    'Co-created content (blog post, video)',
+    'Referral program with incentives',
+    'Shared workshop or webinar'
+)
+
+@functools.lru_cache(maxsize=256)
+def _collaboration_ideas(industry1: str, industry2: str, local1: bool, local2: bool) -> Tuple[str, ...]:
+    """Ideas for an industry pair, local ideas when both are local, then the generic ones"""
+    local_ideas = LOCAL_IDEAS if local1 and local2 else ()
+    return PAIR_IDEAS.get((industry1, industry2), ()) + local_ideas + GENERIC_IDEAS
+
+def _json_set(raw) -> frozenset:
+    """Parse a JSON list column into a frozenset; NULL or empty becomes empty"""
+    return frozenset(json.loads(raw or '[]'))
+
 class CollaborationEngine:
+    # Database paths whose match schema this process has already created
+    _initialized = set()
+    _init_lock = threading.Lock()
+    
     def __init__(self, db_path='platform.db'):
         self.db_path = db_path
+        self._local = threading.local()
+        
+        # In-memory match indexes, rebuilt when vendor_profiles_version moves on.
+        # _vendor_by_id holds (business_name, industry, location, goals,
+        # target_audience JSON, budget) with goals already a frozenset
+        self._index_lock = threading.Lock()
+        self._index_version = None
+        self._vendor_by_id: Dict[int, Tuple] = {}
+        self._goal_to_vendors: Dict[str, Set[int]] = {}
+        self._industry_to_vendors: Dict[str, Set[int]] = {}
+        self._location_to_vendors: Dict[str, Set[int]] = {}
+        self.ensure_schema()
+    
+    def get_connection(self) -> sqlite3.Connection:
+        """Long-lived connection for the calling thread"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, check_same_thread=False, cached_statements=128)
+            conn.row_factory = sqlite3.Row
+            conn.executescript(CONNECTION_PRAGMAS)
+            self._local.conn = conn
+        return conn
+    
+    def ensure_schema(self) -> bool:
+        """Create the matching indexes, goal table and triggers once per database"""
+        if self.db_path in CollaborationEngine._initialized:
+            return True
+        with CollaborationEngine._init_lock:
+            if self.db_path not in CollaborationEngine._initialized:
+                try:
+                    self.get_connection().executescript(MATCH_SCHEMA)
+                except sqlite3.OperationalError:
+                    return False  # Base schema not created yet
+                CollaborationEngine._initialized.add(self.db_path)
+        return True
+    
+    def _rebuild_indices(self, version: int):
+        """Load every vendor into the goal, industry and location indexes"""
+        conn = self.get_connection()
+        vendor_goals: Dict[int, Set[str]] = {}
+        vendor_by_id = {}
+        goal_to_vendors = {}
+        industry_to_vendors = {}
+        location_to_vendors = {}
+        
+        for vendor_id, goal in conn.execute(_SQL_GET_GOALS):
+            vendor_goals.setdefault(vendor_id, set()).add(goal)
+        
+        for vendor_id, name, industry, location, audience, budget in conn.execute(_SQL_GET_VENDORS):
+            goals = frozenset(vendor_goals.get(vendor_id, ()))
+            vendor_by_id[vendor_id] = (name, industry, location, goals, audience, budget)
+            industry_to_vendors.setdefault(industry, set()).add(vendor_id)
+            location_to_vendors.setdefault(location, set()).add(vendor_id)
+            for goal in goals:
+                goal_to_vendors.setdefault(goal, set()).add(vendor_id)
+        
+        self._vendor_by_id = vendor_by_id
+        self._goal_to_vendors = goal_to_vendors
+        self._industry_to_vendors = industry_to_vendors
+        self._location_to_vendors = location_to_vendors
+        self._index_version = version
+    
+    def _current_indices(self) -> Tuple[Dict, Dict, Dict, Dict]:
+        """Match indexes, rebuilt first if any vendor was written since the last build"""
+        self.ensure_schema()
+        version = self.get_connection().execute(_SQL_GET_VERSION).fetchone()[0]
+        
+        # A write landing mid-rebuild leaves the stored version behind, so the
+        # next call rebuilds again rather than serving stale data
+        with self._index_lock:
+            if version != self._index_version:
+                self._rebuild_indices(version)
+            return (self._vendor_by_id, self._goal_to_vendors,
+                    self._industry_to_vendors, self._location_to_vendors)
     
     def find_collaboration_matches(self, vendor_id: int) -> List[Dict]:
         """Find potential collaboration partners"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Get requesting vendor profile
-        cursor.execute('SELECT * FROM vendor_profiles WHERE vendor_id = ?', (vendor_id,))
-        requester = cursor.fetchone()
+        vendor_by_id, goal_to_vendors, industry_to_vendors, location_to_vendors = self._current_indices()
         
+        requester = vendor_by_id.get(vendor_id)
         if not requester:
             return []
         
-        requester_dict = dict(requester)
-        
-        # Get all other vendors
-        cursor.execute('SELECT * FROM vendor_profiles WHERE vendor_id != ?', (vendor_id,))
-        all_vendors = cursor.fetchall()
-        
-        matches = []
-        
-        for vendor in all_vendors:
-            vendor_dict = dict(vendor)
-            match_score = 0
-            collaboration_types = []
-            
-            # Industry complementarity (30 points)
-            if self.are_industries_complementary(requester_dict['industry'], vendor_dict['industry']):
-                match_score += 30
-                collaboration_types.append('cross_promotion')
-            
-            # Location proximity (20 points)
-            if requester_dict['location'] == vendor_dict['location']:
-                match_score += 20
-                collaboration_types.append('local_partnership')
-            
-            # Goal alignment (25 points)
-            requester_goals = json.loads(requester_dict['goals'])
-            vendor_goals = json.loads(vendor_dict['goals'])
-            
-            common_goals = set(requester_goals) & set(vendor_goals)
-            if common_goals:
-                match_score += len(common_goals) * 5
-                collaboration_types.append('shared_objectives')
-            
-            # Skill complementarity (25 points)
-            if self.has_complementary_skills(requester_dict, vendor_dict):
-                match_score += 25
-                collaboration_types.append('skill_exchange')
-            
-            if match_score >= 40:  # Minimum threshold
-                matches.append({
-                    'vendor_id': vendor_dict['vendor_id'],
-                    'business_name': vendor_dict['business_name'],
-                    'industry': vendor_dict['industry'],
-                    'location': vendor_dict['location'],
-                    'match_score': match_score,
-                    'collaboration_types': collaboration_types,
-                    'synergy_areas': self.find_synergy_areas(requester_dict, vendor_dict)
-                })
-        
-        conn.close()
-        
-        # Sort by match score
-        matches.sort(key=lambda x: x['match_score'], reverse=True)
-        return matches[:10]  # Return top 10 matches
+        _, requester_industry, requester_location, requester_goals, requester_audience, requester_budget = requester
+        
+        # Only score vendors that can reach the 40 point threshold: without a
+        # complementary industry (30) or the same location (20), skills (25) plus
+        # at least three shared goals (5 each) is the only way there
+        related = COMPLEMENTARY_INDEX.get(requester_industry, set()) | {requester_industry}
+        candidate_ids = set(location_to_vendors.get(requester_location, ()))
+        for industry in related:
+            candidate_ids |= industry_to_vendors.get(industry, set())
+        if len(requester_goals) >= 3:
+            for goal in requester_goals:
+                candidate_ids |= goal_to_vendors.get(goal, set())
+        candidate_ids.discard(vendor_id)
+        
+        if not candidate_ids:
+            return []
+        
+        # Industry complementarity and skill overlap depend only on the candidate's
+        # industry, so they are worked out once per industry
+        complementary_industries = {industry for industry in related
+                                    if self.are_industries_complementary(requester_industry, industry)}
+        skill_clash = {industry for industry in SKILL_SETS
+                       if not self.has_complementary_skills({'industry': requester_industry},
+                                                            {'industry': industry})}
+        
+        # Work column-wise, in vendor order so ties keep it
+        ids = sorted(candidate_ids)
+        names, industries, locations, goal_sets, audience_json, budgets = zip(*map(vendor_by_id.get, ids))
+        
+        same_location = np.array([location == requester_location for location in locations], dtype=np.int64)
+        scores, type_bits = _score_candidates(
+            np.array([industry in complementary_industries for industry in industries], dtype=np.int64),
+            same_location,
+            np.array([len(goals & requester_goals) for goals in goal_sets], dtype=np.int64),
+            np.array([industry not in skill_clash for industry in industries], dtype=np.int64)
+        )
+        requester_audience = _json_set(requester_audience)
+        
+        # Top 10 matches above the minimum threshold; the stable sort keeps vendor
+        # order on ties. Synergy areas need the vendor's JSON decoded, so only the
+        # winners get them
+        matched = np.flatnonzero(scores >= 40)
+        winners = matched[np.argsort(-scores[matched], kind='stable')[:10]]
+        
+        top_matches = []
+        for i in winners.tolist():
+            top_matches.append({
+                'vendor_id': ids[i],
+                'business_name': names[i],
+                'industry': industries[i],
+                'location': locations[i],
+                'match_score': int(scores[i]),
+                'collaboration_types': [name for bit, name in COLLABORATION_TYPE_BITS if type_bits[i] & bit],
+                'synergy_areas': self.find_synergy_areas(
+                    requester_goals, requester_audience, requester_budget,
+                    goal_sets[i], _json_set(audience_json[i]), budgets[i],
+                    bool(same_location[i])
+                )
+            })
+        
+        return top_matches
     
     def are_industries_complementary(self, industry1: str, industry2: str) -> bool:
         """Check if two industries are complementary"""
-        complementary_pairs = [
-            ('restaurant', 'food_delivery'),
-            ('retail', 'logistics'),
-            ('software', 'consulting'),
-            ('photography', 'real_estate'),
-            ('event_planning', 'catering')
-        ]
-        
-        for pair in complementary_pairs:
-            if (industry1 == pair[0] and industry2 == pair[1]) or \
-               (industry1 == pair[1] and industry2 == pair[0]):
-                return True
-        
-        return False
+        return (industry1, industry2) in COMPLEMENTARY_SET
     
     def has_complementary_skills(self, vendor1: Dict, vendor2: Dict) -> bool:
         """Check if vendors have complementary skills"""
-        # Simplified skill detection based on business type
-        skill_map = {
-            'restaurant': ['culinary', 'customer_service', 'inventory_management'],
-            'technology': ['programming', 'product_development', 'technical_support'],
-            'retail': ['sales', 'merchandising', 'customer_relations'],
-            'consulting': ['strategy', 'analysis', 'client_management'],
-            'creative': ['design', 'content_creation', 'branding']
-        }
-        
-        skills1 = skill_map.get(vendor1['industry'], [])
-        skills2 = skill_map.get(vendor2['industry'], [])
+        skills1 = SKILL_SETS.get(vendor1['industry'], NO_SKILLS)
+        skills2 = SKILL_SETS.get(vendor2['industry'], NO_SKILLS)
         
         # Check if they have different primary skills
-        return len(set(skills1) & set(skills2)) < 2
+        return len(skills1 & skills2) < 2
     
-    def find_synergy_areas(self, vendor1: Dict, vendor2: Dict) -> List[str]:
+    def find_synergy_areas(self, goals1: frozenset, audience1: frozenset, budget1,
+                           goals2: frozenset, audience2: frozenset, budget2,
+                           same_location: bool) -> List[str]:
         """Find specific areas of synergy between vendors"""
         synergies = []
         
         # Customer sharing
-        if vendor1['target_audience'] and vendor2['target_audience']:
-            audience1 = json.loads(vendor1['target_audience'])
-            audience2 = json.loads(vendor2['target_audience'])
-            
-            if set(audience1) & set(audience2):
-                synergies.append('shared_customer_base')
+        if audience1 & audience2:
+            synergies.append('shared_customer_base')
         
         # Resource sharing
-        if vendor1['budget'] < 5000 or vendor2['budget'] < 5000:
+        if budget1 < 5000 or budget2 < 5000:
             synergies.append('resource_pooling')
         
         # Marketing synergy
-        if 'increase_sales' in json.loads(vendor1['goals']) and \
-           'increase_sales' in json.loads(vendor2['goals']):
+        if 'increase_sales' in goals1 and 'increase_sales' in goals2:
             synergies.append('joint_marketing')
         
         # Geographic synergy
-        if vendor1['location'] == vendor2['location']:
+        if same_location:
             synergies.append('local_partnership')
         
         return synergies
     
     def initiate_collaboration(self, vendor1_id: int, vendor2_id: int, collaboration_type: str) -> int:
         """Initiate a collaboration between two vendors"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT INTO collaborations 
-            (vendor1_id, vendor2_id, collaboration_type, status)
-            VALUES (?, ?, ?, ?)
-        ''', (vendor1_id, vendor2_id, collaboration_type, 'proposed'))
-        
-        collab_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
+        return self.initiate_collaborations([(vendor1_id, vendor2_id, collaboration_type)])[0]
+    
+    def initiate_collaborations(self, pairs: List[Tuple[int, int, str]]) -> List[int]:
+        """Initiate several collaborations in one transaction, returning their ids"""
+        conn = self.get_connection()
         
-        return collab_id
+        # One write lock and one commit for the whole batch; rows go in one at a
+        # time so each new collaboration_id can be returned
+        with conn:
+            conn.execute('BEGIN IMMEDIATE')
+            return [conn.execute(_SQL_INSERT_COLLAB, (vendor1_id, vendor2_id, collaboration_type, 'proposed')).lastrowid
+                    for vendor1_id, vendor2_id, collaboration_type in pairs]
     
     def get_collaboration_ideas(self, vendor1: Dict, vendor2: Dict) -> List[str]:
         """Generate collaboration ideas for two vendors"""
-        ideas = []
-        
-        if vendor1['industry'] == 'restaurant' and vendor2['industry'] == 'food_delivery':
-            ideas.extend([
-                'Joint promotion: Free delivery with restaurant purchase',
-                'Co-branded marketing campaign',
-                'Shared customer loyalty program'
-            ])
-        
-        if vendor1['industry'] == 'retail' and vendor2['industry'] == 'retail':
-            ideas.extend([
-                'Cross-promotion in each other\'s stores',
-                'Joint pop-up event',
-                'Bundle deals combining products'
-            ])
-        
-        if 'local' in vendor1['location'] and 'local' in vendor2['location']:
-            ideas.extend([
-                'Co-host local community event',
-                'Joint advertisement in local newspaper',
-                'Shared booth at local fair'
-            ])
-        
-        # Generic collaboration ideas
-        ideas.extend([
-            'Social media shoutout exchange',
-            'Co-created content (blog post, video)',
-            'Referral program with incentives',
-            'Shared workshop or webinar'
-        ])
-        
-        return ideas
\ No newline at end of file
+        return list(_collaboration_ideas(
+            vendor1['industry'], vendor2['industry'],
+            'local' in vendor1['location'], 'local' in vendor2['location']
+        ))
\ No newline at end of file
@@ -1,96 +1,321 @@
 import sqlite3
 import json
+import threading
+from collections import Counter
 from typing import List, Dict, Any
 
+import numpy as np
+
+try:
+    from numba import njit, prange
+except ImportError:
+    # numba is optional - without it the kernels below run as plain Python
+    def njit(*args, **kwargs):
+        if args and callable(args[0]):
+            return args[0]
+        return lambda func: func
+    prange = range
+
+
+# SWAR popcount masks; shift amounts are uint64 too so numpy never promotes to float64
+_M1 = np.uint64(0x5555555555555555)
+_M2 = np.uint64(0x3333333333333333)
+_M4 = np.uint64(0x0F0F0F0F0F0F0F0F)
+_S1, _S2, _S4, _S8, _S16, _S32 = (np.uint64(n) for n in (1, 2, 4, 8, 16, 32))
+
+
+@njit(cache=True)
+def _popcount64(x):
+    """Count the set bits of a uint64 token mask (works on scalars and arrays)"""
+    x = x - ((x >> _S1) & _M1)
+    x = (x & _M2) + ((x >> _S2) & _M2)
+    x = (x + (x >> _S4)) & _M4
+    x = x + (x >> _S8)
+    x = x + (x >> _S16)
+    x = x + (x >> _S32)
+    return x & np.uint64(0x7F)
+
+
+@njit(cache=True)
+def _bits_overlap(a, b):
+    """Jaccard overlap of two lane-sharded token masks, 0 when either set is empty"""
+    count_a = 0
+    count_b = 0
+    inter = 0
+    for k in range(a.shape[0]):
+        count_a += _popcount64(a[k])
+        count_b += _popcount64(b[k])
+        inter += _popcount64(a[k] & b[k])
+    if count_a == 0 or count_b == 0:
+        return 0.0
+    return inter / (count_a + count_b - inter)
+
+
+@njit(cache=True, fastmath=True)
+def _sim_kernel(i_ind, i_bt, i_loc, i_city, i_budget, i_aud_bits,
+                j_ind, j_bt, j_loc, j_city, j_budget, j_aud_bits):
+    """Weighted similarity of two encoded vendors (same weights as calculate_similarity)"""
+    score = 0.0
+    
+    # Industry match (40%)
+    if i_ind == j_ind:
+        score += 0.4
+    
+    # Location proximity (20%), -1 marks a missing location
+    if i_loc >= 0 and j_loc >= 0:
+        if i_loc == j_loc:
+            score += 0.2
+        elif i_city == j_city:
+            score += 0.1
+    
+    # Business type (15%)
+    if i_bt == j_bt:
+        score += 0.15
+    
+    # Target audience overlap (15%)
+    score += _bits_overlap(i_aud_bits, j_aud_bits) * 0.15
+    
+    # Budget similarity (10%)
+    if i_budget > 0 and j_budget > 0:
+        score += min(i_budget, j_budget) / max(i_budget, j_budget) * 0.1
+    
+    return score
+
+
+@njit(cache=True, parallel=True)
+def _sim_kernel_vs_all(t, industries, business_types, locations, cities, budgets, audience_bits):
+    """Similarity of vendor row t against every row of the encoded arrays"""
+    n = industries.shape[0]
+    out = np.empty(n, dtype=np.float64)
+    for j in prange(n):
+        out[j] = _sim_kernel(
+            industries[t], business_types[t], locations[t], cities[t], budgets[t], audience_bits[t],
+            industries[j], business_types[j], locations[j], cities[j], budgets[j], audience_bits[j]
+        )
+    return out
+
+
+def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Positions of the k largest scores, best first
+
+    Quickselect finds the k-th best score in O(N); only the rows at or above it get
+    sorted, stably, so ties keep row order exactly like a full sort would.
+    """
+    if 0 < k < len(scores):
+        kth = np.partition(scores, len(scores) - k)[len(scores) - k]
+        candidates = np.flatnonzero(scores >= kth)
+    else:
+        candidates = np.arange(len(scores))
+    return candidates[np.argsort(-scores[candidates], kind='stable')][:k]
+
+
+class _Codebook:
+    """Dictionary encoding of a string column: each distinct value gets a small int code"""
+    
+    def __init__(self):
+        self.codes: Dict[Any, int] = {}
+        self.labels: List[Any] = []
+        self._lock = threading.Lock()
+    
+    def encode(self, value) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            with self._lock:
+                code = self.codes.get(value)
+                if code is None:
+                    code = len(self.labels)
+                    self.labels.append(value)
+                    self.codes[value] = code
+        return code
+    
+    def encode_all(self, values) -> np.ndarray:
+        return np.fromiter((self.encode(value) for value in values), dtype=np.int32)
+
+
+# Codes are shared by every table load so they stay comparable across snapshots
+_INDUSTRY_CODES = _Codebook()
+_BUSINESS_TYPE_CODES = _Codebook()
+_LOCATION_CODES = _Codebook()
+_CITY_CODES = _Codebook()
+
+
+def _encode_tokens(raw_lists):
+    """Encode JSON token lists as uint64 bitmasks, one lane per 64 distinct tokens
+
+    Bits are handed out by token frequency so the common tokens share the first lane.
+    Returns the (n, lanes) mask array and the bit -> token list used to decode it.
+    """
+    parsed = [json.loads(raw or '[]') for raw in raw_lists]
+    counts = Counter(token for tokens in parsed for token in set(tokens))
+    tokens = [token for token, _ in counts.most_common()]
+    token_to_bit = {token: bit for bit, token in enumerate(tokens)}
+    
+    bits = np.zeros((len(parsed), max(1, -(-len(tokens) // 64))), dtype=np.uint64)
+    for i, row_tokens in enumerate(parsed):
+        for token in row_tokens:
+            bit = token_to_bit[token]
+            bits[i, bit >> 6] |= np.uint64(1 << (bit & 63))
+    return bits, tokens
+
+
+def _decode_tokens(lanes, tokens) -> List[str]:
+    """Turn a lane-sharded bitmask back into its tokens, most frequent first"""
+    decoded = []
+    for lane, mask in enumerate(lanes):
+        mask = int(mask)
+        while mask:
+            low = mask & -mask
+            decoded.append(tokens[(lane << 6) + low.bit_length() - 1])
+            mask ^= low
+    return decoded
+
+
+class _VendorTable:
+    """Structure-of-arrays snapshot of vendor_profiles used by the similarity sweeps
+
+    Every field lives in its own contiguous column so the kernels stream a single
+    array per factor instead of hopping through one dict per vendor.
+    """
+    
+    def __init__(self, rows):
+        self.vendor_ids = np.array([r['vendor_id'] for r in rows], dtype=np.int64)
+        self.business_names = np.array([r['business_name'] for r in rows], dtype=object)
+        self.industries = _INDUSTRY_CODES.encode_all(r['industry'] for r in rows)
+        self.business_types = _BUSINESS_TYPE_CODES.encode_all(r['business_type'] for r in rows)
+        self.locations = np.array([r['location'] for r in rows], dtype=object)
+        # -1 marks a missing location so it never matches anything
+        self.location_codes = np.fromiter(
+            (_LOCATION_CODES.encode(r['location']) if r['location'] else -1 for r in rows), dtype=np.int32
+        )
+        self.cities = np.fromiter(
+            (_CITY_CODES.encode(r['location'].split(',')[0]) if r['location'] else -1 for r in rows), dtype=np.int32
+        )
+        self.budgets = np.array([r['budget'] or 0 for r in rows], dtype=np.float64)
+        self.audience_bits, self.audience_tokens = _encode_tokens(r['target_audience'] for r in rows)
+        self.goals_bits, self.goal_tokens = _encode_tokens(r['goals'] for r in rows)
+        
+        self._positions = {vendor_id: i for i, vendor_id in enumerate(self.vendor_ids.tolist())}
+    
+    def __len__(self):
+        return len(self.vendor_ids)
+    
+    def index_of(self, vendor_id: int):
+        """Row position of a vendor, None when it is not in the table"""
+        return self._positions.get(vendor_id)
+    
+    def industry(self, i: int) -> str:
+        return _INDUSTRY_CODES.labels[self.industries[i]]
+    
+    def row(self, i: int) -> Dict:
+        """Materialize one vendor as a dict (JSON list columns come back decoded)"""
+        return {
+            'vendor_id': int(self.vendor_ids[i]),
+            'business_name': self.business_names[i],
+            'industry': self.industry(i),
+            'business_type': _BUSINESS_TYPE_CODES.labels[self.business_types[i]],
+            'location': self.locations[i],
+            'budget': float(self.budgets[i]),
+            'target_audience': _decode_tokens(self.audience_bits[i], self.audience_tokens),
+            'goals': _decode_tokens(self.goals_bits[i], self.goal_tokens)
+        }
+    
+    def similarity(self, i: int, j: int) -> float:
+        return float(_sim_kernel(
+            self.industries[i], self.business_types[i], self.location_codes[i],
+            self.cities[i], self.budgets[i], self.audience_bits[i],
+            self.industries[j], self.business_types[j], self.location_codes[j],
+            self.cities[j], self.budgets[j], self.audience_bits[j]
+        ))
+    
+    def similarity_vs_all(self, t: int) -> np.ndarray:
+        return _sim_kernel_vs_all(
+            t, self.industries, self.business_types, self.location_codes,
+            self.cities, self.budgets, self.audience_bits
+        )
+    
+    def shared_goals(self, i: int, j: int) -> List[str]:
+        return _decode_tokens(self.goals_bits[i] & self.goals_bits[j], self.goal_tokens)
+
+
 class CommunityMatching:
     def __init__(self, db_path='platform.db'):
         self.db_path = db_path
     
-    def find_similar_vendors(self, vendor_id: int, limit: int = 10) -> List[Dict]:
-        """Find vendors with similar profiles"""
+    def load_vendor_table(self) -> _VendorTable:
+        """Snapshot every vendor profile into a column table"""
         conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
-        # Get target vendor profile
-        cursor.execute('SELECT * FROM vendor_profiles WHERE vendor_id = ?', (vendor_id,))
-        target_vendor = cursor.fetchone()
+        cursor.execute('SELECT * FROM vendor_profiles')
+        table = _VendorTable(cursor.fetchall())
+        
+        conn.close()
+        return table
+    
+    def find_similar_vendors(self, vendor_id: int, limit: int = 10, table: _VendorTable = None) -> List[Dict]:
+        """Find vendors with similar profiles"""
+        if table is None:
+            table = self.load_vendor_table()
         
-        if not target_vendor:
+        target = table.index_of(vendor_id)
+        if target is None:
             return []
         
-        target_dict = dict(target_vendor)
+        target_dict = table.row(target)
+        scores = table.similarity_vs_all(target)
         
-        # Get all other vendors
-        cursor.execute('SELECT * FROM vendor_profiles WHERE vendor_id != ?', (vendor_id,))
-        all_vendors = cursor.fetchall()
+        # Threshold, then pick the top matches without sorting every candidate
+        candidates = np.flatnonzero(scores > 0.3)
+        candidates = candidates[candidates != target]
         
         similarities = []
         
-        for vendor in all_vendors:
-            vendor_dict = dict(vendor)
-            similarity_score = self.calculate_similarity(target_dict, vendor_dict)
-            
-            if similarity_score > 0.3:  # Threshold
-                similarities.append({
-                    'vendor_id': vendor_dict['vendor_id'],
-                    'business_name': vendor_dict['business_name'],
-                    'industry': vendor_dict['industry'],
-                    'similarity_score': similarity_score,
-                    'common_features': self.get_common_features(target_dict, vendor_dict)
-                })
-        
-        conn.close()
+        for i in candidates[_top_k(scores[candidates], limit)]:
+            similarities.append({
+                'vendor_id': int(table.vendor_ids[i]),
+                'business_name': table.business_names[i],
+                'industry': table.industry(i),
+                'similarity_score': float(scores[i]),
+                'common_features': self.get_common_features(target_dict, table.row(i), table.shared_goals(target, i))
+            })
         
-        # Sort by similarity score
-        similarities.sort(key=lambda x: x['similarity_score'], reverse=True)
-        return similarities[:limit]
+        return similarities
     
     def calculate_similarity(self, vendor1: Dict, vendor2: Dict) -> float:
         """Calculate similarity score between two vendors"""
-        score = 0
-        factors = 0
-        
-        # Industry match (40%)
-        if vendor1['industry'] == vendor2['industry']:
-            score += 0.4
-        factors += 0.4
-        
-        # Location proximity (20%)
-        if vendor1['location'] and vendor2['location']:
-            # Simple location match
-            if vendor1['location'] == vendor2['location']:
-                score += 0.2
-            elif vendor1['location'].split(',')[0] == vendor2['location'].split(',')[0]:
-                score += 0.1
-        factors += 0.2
-        
-        # Business type (15%)
-        if vendor1['business_type'] == vendor2['business_type']:
-            score += 0.15
-        factors += 0.15
-        
-        # Target audience overlap (15%)
-        audience1 = set(json.loads(vendor1['target_audience']))
-        audience2 = set(json.loads(vendor2['target_audience']))
-        
-        if audience1 and audience2:
-            overlap = len(audience1.intersection(audience2)) / len(audience1.union(audience2))
-            score += overlap * 0.15
-        factors += 0.15
-        
-        # Budget similarity (10%)
-        budget1 = vendor1['budget'] or 0
-        budget2 = vendor2['budget'] or 0
-        
-        if budget1 > 0 and budget2 > 0:
-            ratio = min(budget1, budget2) / max(budget1, budget2)
-            score += ratio * 0.1
-        factors += 0.1
-        
-        return score / factors if factors > 0 else 0
+        # Pair-local codes (0 for vendor1's value, 1 for vendor2's unless equal), so
+        # nothing is added to the shared codebooks
+        location1, location2 = vendor1['location'], vendor2['location']
+        if location1 and location2:
+            location_codes = (0, int(location1 != location2))
+            city_codes = (0, int(location1.split(',')[0] != location2.split(',')[0]))
+        else:
+            location_codes = city_codes = (-1, -1)
+        
+        audience1 = set(json.loads(vendor1['target_audience'] or '[]'))
+        audience2 = set(json.loads(vendor2['target_audience'] or '[]'))
+        token_bits = {token: bit for bit, token in enumerate(audience1 | audience2)}
+        audience_bits = np.zeros((2, max(1, -(-len(token_bits) // 64))), dtype=np.uint64)
+        for i, audience in enumerate((audience1, audience2)):
+            for token in audience:
+                bit = token_bits[token]
+                audience_bits[i, bit >> 6] |= np.uint64(1 << (bit & 63))
+        
+        return float(_sim_kernel(
+            0, 0, location_codes[0], city_codes[0],
+            float(vendor1['budget'] or 0), audience_bits[0],
+            int(vendor1['industry'] != vendor2['industry']),
+            int(vendor1['business_type'] != vendor2['business_type']),
+            location_codes[1], city_codes[1],
+            float(vendor2['budget'] or 0), audience_bits[1]
+        ))
     
-    def get_common_features(self, vendor1: Dict, vendor2: Dict) -> List[str]:
-        """Get common features between vendors"""
+    def get_common_features(self, vendor1: Dict, vendor2: Dict, shared_goals: List[str] = None) -> List[str]:
+        """Get common features between vendors
+
+        shared_goals can be passed in when the caller already intersected the goal bitmasks.
+        """
         common = []
         
         if vendor1['industry'] == vendor2['industry']:
@@ -100,12 +325,13 @@ class CommunityMatching:
             common.append(f"Same location: {vendor1['location']}")
         
         # Common goals
-        goals1 = set(json.loads(vendor1['goals']))
-        goals2 = set(json.loads(vendor2['goals']))
-        common_goals = goals1.intersection(goals2)
+        if shared_goals is None:
+            goals1 = set(json.loads(vendor1['goals']))
+            goals2 = set(json.loads(vendor2['goals']))
+            shared_goals = list(goals1.intersection(goals2))
         
-        if common_goals:
-            common.append(f"Shared goals: {', '.join(list(common_goals)[:3])}")
+        if shared_goals:
+            common.append(f"Shared goals: {', '.join(shared_goals[:3])}")
         
         # Similar budget range
         budget1 = vendor1['budget'] or 0
@@ -118,12 +344,9 @@ class CommunityMatching:
     
     def create_community_groups(self):
         """Create community groups based on similarities"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Get all vendors
-        cursor.execute('SELECT vendor_id FROM vendor_profiles')
-        vendor_ids = [row[0] for row in cursor.fetchall()]
+        # Snapshot the vendors once and reuse it for every similarity sweep
+        table = self.load_vendor_table()
+        vendor_ids = table.vendor_ids.tolist()
         
         groups = []
         processed = set()
@@ -133,7 +356,7 @@ class CommunityMatching:
                 continue
             
             # Find similar vendors
-            similar = self.find_similar_vendors(vendor_id, limit=5)
+            similar = self.find_similar_vendors(vendor_id, limit=5, table=table)
             similar_ids = [s['vendor_id'] for s in similar if s['similarity_score'] > 0.5]
             
             if similar_ids:
@@ -142,21 +365,28 @@ class CommunityMatching:
                     'name': f"Community Group {len(groups) + 1}",
                     'members': group,
                     'size': len(group),
-                    'common_industry': self.get_common_industry(group)
+                    'common_industry': self.get_common_industry(group, table)
                 })
                 
                 processed.update(group)
             else:
                 processed.add(vendor_id)
         
-        conn.close()
         return groups
     
-    def get_common_industry(self, vendor_ids: List[int]) -> str:
+    def get_common_industry(self, vendor_ids: List[int], table: _VendorTable = None) -> str:
         """Get the most common industry among vendors"""
         if not vendor_ids:
             return "Mixed"
         
+        if table is not None:
+            # Count the members' industry codes instead of grouping strings in SQL
+            positions = [table.index_of(vendor_id) for vendor_id in vendor_ids]
+            codes = table.industries[[i for i in positions if i is not None]]
+            if not len(codes):
+                return "Mixed"
+            return _INDUSTRY_CODES.labels[int(np.bincount(codes).argmax())]
+        
         conn = sqlite3.connect(self.db_path)
         cursor = conn.cursor()
         
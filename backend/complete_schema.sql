@@ -18,6 +18,10 @@ CREATE TABLE IF NOT EXISTS vendor_profiles (
     FOREIGN KEY (user_id) REFERENCES users(id)
 );
 
+-- The vendor and collaboration match indexes, vendor_goals and vendor_profiles_version
+-- (with their triggers) are created by CollaborationEngine; see MATCH_SCHEMA in
+-- collaboration_engine.py
+
 -- Advertising Campaigns
 CREATE TABLE IF NOT EXISTS ad_campaigns (
     campaign_id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -40,6 +44,8 @@ CREATE TABLE IF NOT EXISTS ad_campaigns (
     FOREIGN KEY (vendor_id) REFERENCES vendor_profiles(vendor_id)
 );
 
+CREATE INDEX IF NOT EXISTS idx_ad_campaigns_vendor_status ON ad_campaigns(vendor_id, status);
+
 -- Content Calendar
 CREATE TABLE IF NOT EXISTS content_calendar (
     content_id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -104,6 +110,10 @@ CREATE TABLE IF NOT EXISTS collaborations (
     FOREIGN KEY (vendor2_id) REFERENCES vendor_profiles(vendor_id)
 );
 
+-- idx_collab_vendors is created by CollaborationEngine (MATCH_SCHEMA)
+CREATE INDEX IF NOT EXISTS idx_collab_v1_status ON collaborations(vendor1_id, status);
+CREATE INDEX IF NOT EXISTS idx_collab_v2_status ON collaborations(vendor2_id, status);
+
 -- AI Recommendations
 CREATE TABLE IF NOT EXISTS ai_recommendations (
     recommendation_id INTEGER PRIMARY KEY AUTOINCREMENT,
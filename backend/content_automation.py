@@ -1,17 +1,50 @@
 import sqlite3
 import json
 from datetime import datetime, timedelta
+from types import MappingProxyType
 from typing import List, Dict, Any
 import schedule
 import time
-from threading import Thread
+from threading import Thread, Lock
 import requests
+import asyncio
+import aiohttp
+
+# Content templates based on industry, built once at import
+_CONTENT_TEMPLATES = MappingProxyType({
+    'restaurant': (
+        "Behind the scenes: How we make our signature dish",
+        "Customer spotlight: Our favorite regulars",
+        "New menu item announcement",
+        "Cooking tips from our chef",
+        "Local ingredient showcase"
+    ),
+    'retail': (
+        "Product highlight: {product}",
+        "How to style: Fashion tips",
+        "Customer reviews showcase",
+        "Sale announcement",
+        "New arrivals preview"
+    ),
+    'services': (
+        "Case study: How we helped {client_type}",
+        "Industry insights: {topic}",
+        "Team member spotlight",
+        "FAQ: Answering common questions",
+        "How-to guide: {task}"
+    )
+})
 
 class ContentAutomation:
     def __init__(self, db_path='platform.db'):
         self.db_path = db_path
         self.scheduler_thread = None
         
+        # Platform posts run on one background event loop sharing a pooled connector
+        self._loop = None
+        self._loop_lock = Lock()
+        self._connector = None
+        
     def generate_content_ideas(self, vendor_id: int, count: int = 10) -> List[Dict]:
         """Generate content ideas for a vendor"""
         conn = sqlite3.connect(self.db_path)
@@ -25,34 +58,9 @@ class ContentAutomation:
         
         vendor_dict = dict(vendor)
         
-        # Content templates based on industry
-        industry_templates = {
-            'restaurant': [
-                "Behind the scenes: How we make our signature dish",
-                "Customer spotlight: Our favorite regulars",
-                "New menu item announcement",
-                "Cooking tips from our chef",
-                "Local ingredient showcase"
-            ],
-            'retail': [
-                "Product highlight: {product}",
-                "How to style: Fashion tips",
-                "Customer reviews showcase",
-                "Sale announcement",
-                "New arrivals preview"
-            ],
-            'services': [
-                "Case study: How we helped {client_type}",
-                "Industry insights: {topic}",
-                "Team member spotlight",
-                "FAQ: Answering common questions",
-                "How-to guide: {task}"
-            ]
-        }
-        
         # Generate content ideas
         content_ideas = []
-        templates = industry_templates.get(vendor_dict['industry'], industry_templates['services'])
+        templates = _CONTENT_TEMPLATES.get(vendor_dict['industry'], _CONTENT_TEMPLATES['services'])
         
         for i in range(min(count, len(templates))):
             content_ideas.append({
@@ -149,22 +157,9 @@ class ContentAutomation:
         conn.commit()
         
         try:
-            # In production, integrate with social media APIs
+            # Post to every platform concurrently instead of one after another
             platforms = json.loads(content_dict['platform'])
-            
-            for platform in platforms:
-                if platform == 'facebook':
-                    # Post to Facebook API
-                    pass
-                elif platform == 'instagram':
-                    # Post to Instagram API
-                    pass
-                elif platform == 'linkedin':
-                    # Post to LinkedIn API
-                    pass
-                elif platform == 'twitter':
-                    # Post to Twitter API
-                    pass
+            self._run_async(self._post_all(content_dict, platforms))
             
             # Update status to posted
             cursor.execute('''
@@ -185,6 +180,38 @@ class ContentAutomation:
         conn.commit()
         conn.close()
     
+    def _run_async(self, coro):
+        """Run a coroutine on the shared background event loop and wait for its result"""
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                Thread(target=self._loop.run_forever, daemon=True).start()
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+    
+    async def _post_all(self, content_dict: Dict, platforms: List[str]):
+        """Fan the post out to all platforms; total latency is the slowest platform"""
+        if self._connector is None:
+            self._connector = aiohttp.TCPConnector(limit=32, ttl_dns_cache=300)
+        
+        async with aiohttp.ClientSession(connector=self._connector, connector_owner=False) as session:
+            await asyncio.gather(*(self._post_one(session, platform, content_dict) for platform in platforms))
+    
+    async def _post_one(self, session: aiohttp.ClientSession, platform: str, content_dict: Dict):
+        """Post content to a single platform"""
+        # In production, integrate with social media APIs through session
+        if platform == 'facebook':
+            # Post to Facebook API
+            pass
+        elif platform == 'instagram':
+            # Post to Instagram API
+            pass
+        elif platform == 'linkedin':
+            # Post to LinkedIn API
+            pass
+        elif platform == 'twitter':
+            # Post to Twitter API
+            pass
+    
     def start_scheduler(self):
         """Start the content scheduler in a separate thread"""
         def run_scheduler():
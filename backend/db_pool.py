@@ -0,0 +1,68 @@
+import sqlite3
+import queue
+import threading
+from contextlib import contextmanager
+
+# Run once when a pool member is opened; connections are autocommit, so multi-statement
+# writes wrap themselves in BEGIN IMMEDIATE ... COMMIT
+POOL_PRAGMAS = '''
+    PRAGMA journal_mode=WAL;
+    PRAGMA synchronous=NORMAL;
+    PRAGMA temp_store=MEMORY;
+    PRAGMA mmap_size=268435456;
+    PRAGMA cache_size=-65536;
+'''
+
+class ConnectionPool:
+    """Fixed-size pool of SQLite connections shared between threads"""
+
+    def __init__(self, db_path='platform.db', size=8):
+        self.db_path = db_path
+        self.size = size
+        self._idle = queue.LifoQueue(maxsize=size)
+        self._lock = threading.RLock()
+        self._opened = 0
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, check_same_thread=False,
+                               isolation_level=None, cached_statements=512)
+        conn.row_factory = sqlite3.Row
+        conn.executescript(POOL_PRAGMAS)
+        return conn
+
+    def _checkout(self):
+        with self._lock:
+            try:
+                return self._idle.get_nowait()
+            except queue.Empty:
+                if self._opened < self.size:
+                    self._opened += 1
+                    try:
+                        return self._connect()
+                    except sqlite3.Error:
+                        self._opened -= 1
+                        raise
+        # Pool exhausted - wait for another thread to hand one back
+        return self._idle.get()
+
+    @contextmanager
+    def acquire(self):
+        """Borrow a connection for the duration of a with block"""
+        conn = self._checkout()
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+            self._idle.put(conn)
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+def get_pool(db_path='platform.db'):
+    """Pool for db_path, created on first use and shared by every manager"""
+    with _pools_lock:
+        pool = _pools.get(db_path)
+        if pool is None:
+            pool = _pools[db_path] = ConnectionPool(db_path)
+        return pool
\ No newline at end of file
@@ -1,11 +1,135 @@
 import sqlite3
 import json
+import threading
 from datetime import datetime
+from types import MappingProxyType
 from typing import List, Dict, Any
 
+import numpy as np
+
+
+def _to_float(value) -> float:
+    """Parse a money column, NaN when it is missing or malformed"""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return float('nan')
+
+
+def _encode_pitch(pitch: Dict, industry_codes: Dict[str, int]) -> np.ndarray:
+    """One-hot industry vector for a pitch over the investor industry vocabulary"""
+    vec = np.zeros(max(1, len(industry_codes)), dtype=np.float32)
+    code = industry_codes.get(pitch['industry'])
+    if code is not None:
+        vec[code] = 1.0
+    return vec
+
+
+def _encode_investor(investor: Dict, industry_codes: Dict[str, int]) -> np.ndarray:
+    """Multi-hot industry vector for an investor, growing the vocabulary as needed"""
+    codes = [industry_codes.setdefault(industry, len(industry_codes))
+             for industry in json.loads(investor['industries'] or '[]')]
+    vec = np.zeros(len(industry_codes), dtype=np.float32)
+    vec[codes] = 1.0
+    return vec
+
+
+# investors_version is bumped by triggers on every investor write, so the cached
+# investor matrix can tell an UPDATE apart from an unchanged table
+INVESTOR_VERSION_SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS investors_version (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        version INTEGER NOT NULL
+    );
+    INSERT OR IGNORE INTO investors_version (id, version) VALUES (1, 0);
+    
+    CREATE TRIGGER IF NOT EXISTS trg_investors_version_insert AFTER INSERT ON investors
+    BEGIN
+        UPDATE investors_version SET version = version + 1 WHERE id = 1;
+    END;
+    
+    CREATE TRIGGER IF NOT EXISTS trg_investors_version_update AFTER UPDATE ON investors
+    BEGIN
+        UPDATE investors_version SET version = version + 1 WHERE id = 1;
+    END;
+    
+    CREATE TRIGGER IF NOT EXISTS trg_investors_version_delete AFTER DELETE ON investors
+    BEGIN
+        UPDATE investors_version SET version = version + 1 WHERE id = 1;
+    END;
+'''
+
+# Version plus row count and max id, so a recreated database never matches an old key
+_SQL_INVESTOR_CACHE_KEY = '''
+    SELECT (SELECT version FROM investors_version WHERE id = 1), COUNT(*), MAX(investor_id)
+    FROM investors
+'''
+
+
+# Pitch deck templates are static, so build them once; generate_pitch_template hands out copies
+_PITCH_TEMPLATES = MappingProxyType({
+    'technology': {
+        'slides': (
+            {'title': 'Problem', 'content': 'What problem are you solving?'},
+            {'title': 'Solution', 'content': 'Your innovative solution'},
+            {'title': 'Market Size', 'content': 'TAM, SAM, SOM analysis'},
+            {'title': 'Business Model', 'content': 'How you make money'},
+            {'title': 'Traction', 'content': 'Current achievements'},
+            {'title': 'Team', 'content': 'Founder backgrounds'},
+            {'title': 'Competition', 'content': 'Competitive landscape'},
+            {'title': 'Funding Ask', 'content': 'How much and for what'}
+        ),
+        'tips': (
+            'Focus on scalability',
+            'Highlight tech differentiation',
+            'Show user growth metrics'
+        )
+    },
+    'restaurant': {
+        'slides': (
+            {'title': 'Concept', 'content': 'Restaurant vision and theme'},
+            {'title': 'Market Need', 'content': 'Local dining gap'},
+            {'title': 'Menu & Pricing', 'content': 'Signature dishes and pricing'},
+            {'title': 'Location Analysis', 'content': 'Site selection rationale'},
+            {'title': 'Operations Plan', 'content': 'Daily operations'},
+            {'title': 'Marketing Strategy', 'content': 'Customer acquisition'},
+            {'title': 'Financial Projections', 'content': '3-year projections'},
+            {'title': 'Funding Use', 'content': 'Equipment, build-out, working capital'}
+        ),
+        'tips': (
+            'Emphasize unique dining experience',
+            'Show local market research',
+            'Include chef credentials'
+        )
+    }
+})
+
+
 class FundraisingManager:
+    # Database paths whose investors_version schema this process has already created
+    _initialized = set()
+    _init_lock = threading.Lock()
+    
     def __init__(self, db_path='platform.db'):
         self.db_path = db_path
+        self._investor_cache = None
+        self.ensure_schema()
+    
+    def ensure_schema(self) -> bool:
+        """Create the investors_version table and its triggers once per database"""
+        if self.db_path in FundraisingManager._initialized:
+            return True
+        with FundraisingManager._init_lock:
+            if self.db_path not in FundraisingManager._initialized:
+                conn = sqlite3.connect(self.db_path)
+                try:
+                    conn.executescript(INVESTOR_VERSION_SCHEMA)
+                except sqlite3.OperationalError:
+                    return False  # Base schema not created yet
+                finally:
+                    conn.close()
+                FundraisingManager._initialized.add(self.db_path)
+        return True
     
     def create_pitch(self, vendor_id: int, pitch_data: Dict) -> int:
         """Create a fundraising pitch"""
@@ -107,9 +231,42 @@ class FundraisingManager:
         conn.close()
         return min(score, 100)
     
+    def _load_investors(self, cursor) -> Dict[str, Any]:
+        """Load investors into column arrays, rebuilt only when the table changes"""
+        # Without the version triggers an UPDATE cannot be detected, so nothing is cached
+        cache_key = None
+        if self.db_path in FundraisingManager._initialized:
+            cursor.execute(_SQL_INVESTOR_CACHE_KEY)
+            cache_key = tuple(cursor.fetchone())
+            if self._investor_cache and self._investor_cache['key'] == cache_key:
+                return self._investor_cache
+        
+        cursor.execute('SELECT * FROM investors')
+        investors = [dict(investor) for investor in cursor.fetchall()]
+        
+        industry_codes = {}
+        vectors = [_encode_investor(investor, industry_codes) for investor in investors]
+        investor_mat = np.zeros((len(investors), max(1, len(industry_codes))), dtype=np.float32)
+        for i, vec in enumerate(vectors):
+            investor_mat[i, :len(vec)] = vec
+        
+        self._investor_cache = {
+            'key': cache_key,
+            'investors': investors,
+            'industry_codes': industry_codes,
+            'investor_mat': investor_mat,
+            'location_preferences': [investor['location_preference'] or '' for investor in investors],
+            'check_min': np.array([_to_float(i['check_size_min']) for i in investors], dtype=np.float64),
+            'check_max': np.array([_to_float(i['check_size_max']) for i in investors], dtype=np.float64)
+        }
+        return self._investor_cache
+    
     def find_investor_matches(self, pitch_id: int) -> List[Dict]:
         """Find matching investors for a pitch"""
+        # No-op once the version schema exists; covers a database set up after __init__
+        self.ensure_schema()
         conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
         # Get pitch details
@@ -122,97 +279,58 @@ class FundraisingManager:
         pitch = cursor.fetchone()
         
         if not pitch:
+            conn.close()
             return []
         
         pitch_dict = dict(pitch)
+        investors = self._load_investors(cursor)
+        conn.close()
         
-        # Find matching investors
-        cursor.execute('SELECT * FROM investors')
-        investors = cursor.fetchall()
+        # Industry match (40 points): one mat-vec against the multi-hot investor matrix
+        pitch_vec = _encode_pitch(pitch_dict, investors['industry_codes'])
+        scores = (investors['investor_mat'] @ pitch_vec) * 40
         
-        matches = []
+        # Location match (30 points)
+        location = pitch_dict['location']
+        if location is not None:
+            scores += 30 * np.array([bool(preference) and location in preference
+                                     for preference in investors['location_preferences']], dtype=np.float32)
         
-        for investor in investors:
-            investor_dict = dict(investor)
-            match_score = 0
-            
-            # Industry match (40 points)
-            investor_industries = json.loads(investor_dict['industries'])
-            if pitch_dict['industry'] in investor_industries:
-                match_score += 40
-            
-            # Location match (30 points)
-            if investor_dict['location_preference']:
-                if pitch_dict['location'] in investor_dict['location_preference']:
-                    match_score += 30
-            
-            # Funding amount match (30 points)
-            try:
-                funding_needed = float(pitch_dict['funding_amount'])
-                check_min = float(investor_dict['check_size_min'])
-                check_max = float(investor_dict['check_size_max'])
-                
-                if check_min <= funding_needed <= check_max:
-                    match_score += 30
-                elif funding_needed < check_min:
-                    match_score += 15
-                else:
-                    match_score += 10
-            except:
-                match_score += 10
-            
-            if match_score >= 50:  # Threshold for showing match
-                matches.append({
-                    'investor': investor_dict['name'],
-                    'firm': investor_dict['firm'],
-                    'match_score': match_score,
-                    'investment_stage': investor_dict['investment_stage'],
-                    'contact_info': investor_dict['contact_info']
-                })
+        # Funding amount match (30 points); a missing or malformed amount on either side
+        # gets the flat 10 points, whatever the other bounds say
+        funding_needed = _to_float(pitch_dict['funding_amount'])
+        check_min, check_max = investors['check_min'], investors['check_max']
+        unparsable = np.isnan(check_min) | np.isnan(check_max) | np.isnan(funding_needed)
+        scores += np.where(unparsable, 10,
+                           np.where((check_min <= funding_needed) & (funding_needed <= check_max), 30,
+                                    np.where(funding_needed < check_min, 15, 10)))
         
-        conn.close()
+        # Threshold for showing match, then keep the top 10 by match score. Quickselect
+        # finds the 10th best score; only matches at or above it are (stably) sorted.
+        candidates = np.flatnonzero(scores >= 50)
+        if len(candidates) > 10:
+            tenth = np.partition(scores[candidates], len(candidates) - 10)[len(candidates) - 10]
+            candidates = candidates[scores[candidates] >= tenth]
+        candidates = candidates[np.argsort(-scores[candidates], kind='stable')]
         
-        # Sort by match score
-        matches.sort(key=lambda x: x['match_score'], reverse=True)
-        return matches[:10]  # Return top 10 matches
+        matches = []
+        for i in candidates[:10]:  # Return top 10 matches
+            investor_dict = investors['investors'][i]
+            matches.append({
+                'investor': investor_dict['name'],
+                'firm': investor_dict['firm'],
+                'match_score': int(scores[i]),
+                'investment_stage': investor_dict['investment_stage'],
+                'contact_info': investor_dict['contact_info']
+            })
+        
+        return matches
     
     def generate_pitch_template(self, industry: str) -> Dict:
         """Generate a pitch deck template"""
-        templates = {
-            'technology': {
-                'slides': [
-                    {'title': 'Problem', 'content': 'What problem are you solving?'},
-                    {'title': 'Solution', 'content': 'Your innovative solution'},
-                    {'title': 'Market Size', 'content': 'TAM, SAM, SOM analysis'},
-                    {'title': 'Business Model', 'content': 'How you make money'},
-                    {'title': 'Traction', 'content': 'Current achievements'},
-                    {'title': 'Team', 'content': 'Founder backgrounds'},
-                    {'title': 'Competition', 'content': 'Competitive landscape'},
-                    {'title': 'Funding Ask', 'content': 'How much and for what'}
-                ],
-                'tips': [
-                    'Focus on scalability',
-                    'Highlight tech differentiation',
-                    'Show user growth metrics'
-                ]
-            },
-            'restaurant': {
-                'slides': [
-                    {'title': 'Concept', 'content': 'Restaurant vision and theme'},
-                    {'title': 'Market Need', 'content': 'Local dining gap'},
-                    {'title': 'Menu & Pricing', 'content': 'Signature dishes and pricing'},
-                    {'title': 'Location Analysis', 'content': 'Site selection rationale'},
-                    {'title': 'Operations Plan', 'content': 'Daily operations'},
-                    {'title': 'Marketing Strategy', 'content': 'Customer acquisition'},
-                    {'title': 'Financial Projections', 'content': '3-year projections'},
-                    {'title': 'Funding Use', 'content': 'Equipment, build-out, working capital'}
-                ],
-                'tips': [
-                    'Emphasize unique dining experience',
-                    'Show local market research',
-                    'Include chef credentials'
-                ]
-            }
-        }
-        
-        return templates.get(industry, templates['technology'])
\ No newline at end of file
+        template = _PITCH_TEMPLATES.get(industry, _PITCH_TEMPLATES['technology'])
+        # Fresh containers per call, so editing a returned template never reaches the shared one
+        return {
+            'slides': [dict(slide) for slide in template['slides']],
+            'tips': list(template['tips'])
+        }
\ No newline at end of file
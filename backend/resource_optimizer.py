@@ -4,38 +4,193 @@ Optimizes system resources for the HAC platform
 """
 
 import psutil
+import numpy as np
 import os
 import sys
 import platform
 import time
+import functools
 from datetime import datetime
 import json
+import heapq
+import sqlite3
+import queue
+import atexit
+from threading import Thread, Lock
+
+try:
+    import orjson
+
+    def _dumps(obj):
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY)
+except ImportError:
+    # orjson is optional - the stdlib encoder produces the same compact output
+    def _dumps(obj):
+        return json.dumps(obj, separators=(',', ':')).encode()
+
+# Before psutil 6.0, process_iter() re-checks every cached Process for PID reuse
+_PSUTIL_NEW = psutil.version_info[:2] >= (6, 0)
+
+# Host details that cannot change while the process runs; platform.processor() and
+# platform.version() can shell out to uname, so they are read once at import
+OS_NAME = platform.system()
+IS_WINDOWS = OS_NAME == 'Windows'
+OS_VERSION = platform.version()
+PROCESSOR = platform.processor()
+PYTHON_VERSION = platform.python_version()
+
+# Temp directories are only reported above this size, so sizing stops there
+TEMP_REPORT_THRESHOLD = 1024**3
+TEMP_SCAN_SECONDS = 5.0
+
+# Platforms a vendor's budget is spread across before any campaign has completed
+DEFAULT_AD_PLATFORMS = ('google', 'facebook', 'instagram')
+
+# Mounts rarely change within a session, so the partition list is reread at most this often
+PARTITION_CACHE_SECONDS = 300
+PSEUDO_FILESYSTEMS = ('tmpfs', 'devtmpfs', 'proc', 'sysfs', 'overlay', 'squashfs')
+
+# A system-wide CPU sample younger than this is reused instead of taking a new one
+CPU_SAMPLE_MAX_AGE = 2.0
+# Shortest window psutil can turn into a meaningful non-blocking CPU percent
+CPU_MIN_WINDOW = 0.1
+
+def _dir_size(path, limit=None, time_budget=None):
+    """Total size of the files under path
+
+    Walks with os.scandir and an explicit stack; DirEntry caches the file type and,
+    on Windows, the stat result from the directory listing, so each entry costs at
+    most one stat() instead of os.walk's classification plus getsize().
+    Returns (size, complete). The walk stops early once size exceeds limit or the
+    time_budget (seconds) runs out, in which case complete is False.
+    """
+    total = 0
+    stack = [path]
+    deadline = time.monotonic() + time_budget if time_budget is not None else None
+    while stack:
+        if deadline is not None and time.monotonic() > deadline:
+            return total, False
+        try:
+            with os.scandir(stack.pop()) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        else:
+                            total += entry.stat(follow_symlinks=False).st_size
+                            if limit is not None and total > limit:
+                                return total, False
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+    return total, True
+
+def _count_processes():
+    """Number of running processes
+
+    On Linux this is one readdir of /proc counting the numeric entries; psutil.pids()
+    builds the same list plus a Python int per pid just to be measured.
+    """
+    if sys.platform.startswith('linux'):
+        try:
+            with os.scandir('/proc') as entries:
+                return sum(1 for entry in entries if entry.name.isdigit())
+        except OSError:
+            pass
+    return len(psutil.pids())
+
+@functools.lru_cache(maxsize=1)
+def _partitions_cached(epoch):
+    """Real disk partitions, one per backing device
+
+    epoch only keys the cache; pass time.monotonic() // PARTITION_CACHE_SECONDS.
+    Bind mounts and pseudo filesystems are dropped so each device is statvfs'd once.
+    """
+    partitions = {}
+    for partition in psutil.disk_partitions(all=False):
+        if partition.fstype.startswith(PSEUDO_FILESYSTEMS):
+            continue
+        partitions.setdefault(partition.device or partition.mountpoint, partition)
+    return tuple(partitions.values())
+
+def _iter_procs(attrs):
+    """process_iter(attrs=...) that skips the PID-reuse check on old psutil
+
+    Each yielded Process carries .info like process_iter provides; attributes that
+    are denied or vanish mid-read come back as None.
+    """
+    if _PSUTIL_NEW:
+        yield from psutil.process_iter(attrs=attrs)
+        return
+    
+    for pid in psutil.pids():
+        try:
+            proc = psutil.Process(pid)
+            proc.info = proc.as_dict(attrs=attrs, ad_value=None)
+        except psutil.NoSuchProcess:
+            continue
+        yield proc
 
 class ResourceOptimizer:
-    def __init__(self):
+    def __init__(self, db_path='platform.db', debug_leaks=False):
+        self.db_path = db_path
+        self.debug_leaks = debug_leaks
+        self._conn = None
+        self._db_lock = Lock()
         self.system_info = {}
         self.optimizations_applied = []
         self.log_file = "optimization_log.json"
-        
+        self._cpu_sample = None  # (percent, time.monotonic()) of the last sample
+        self._pid_count = None
+        self._procs = None  # per-process snapshot shared within one run_optimization
+        self._log_queue = queue.Queue()
+        self._log_writer = None
+        self._log_writer_lock = Lock()
+        
+        # Prime the system-wide CPU counter so later non-blocking reads measure from here
+        psutil.cpu_percent(interval=None)
+        self._cpu_primed_at = time.monotonic()
+        
+    def _sample_cpu(self):
+        """System CPU percent, reusing a recent sample when there is one"""
+        if self._cpu_sample is not None:
+            cpu_percent, sampled_at = self._cpu_sample
+            if time.monotonic() - sampled_at < CPU_SAMPLE_MAX_AGE:
+                return cpu_percent
+        
+        # Non-blocking read covering the time since the previous one; only waits if
+        # that window is too short to measure
+        window = time.monotonic() - self._cpu_primed_at
+        if window < CPU_MIN_WINDOW:
+            time.sleep(CPU_MIN_WINDOW - window)
+        
+        cpu_percent = psutil.cpu_percent(interval=None)
+        self._cpu_primed_at = time.monotonic()
+        self._cpu_sample = (cpu_percent, self._cpu_primed_at)
+        return cpu_percent
+    
     def get_system_info(self):
         """Get detailed system information"""
+        vm = psutil.virtual_memory()
+        self._pid_count = _count_processes()
         self.system_info = {
             "timestamp": datetime.now().isoformat(),
-            "os": platform.system(),
-            "os_version": platform.version(),
-            "processor": platform.processor(),
+            "os": OS_NAME,
+            "os_version": OS_VERSION,
+            "processor": PROCESSOR,
             "cpu_count": psutil.cpu_count(logical=True),
             "cpu_physical_count": psutil.cpu_count(logical=False),
-            "total_ram_gb": round(psutil.virtual_memory().total / (1024**3), 2),
-            "available_ram_gb": round(psutil.virtual_memory().available / (1024**3), 2),
-            "ram_percent_used": psutil.virtual_memory().percent,
+            "total_ram_gb": round(vm.total / (1024**3), 2),
+            "available_ram_gb": round(vm.available / (1024**3), 2),
+            "ram_percent_used": vm.percent,
             "disk_usage": {},
-            "processes_running": len(psutil.pids()),
-            "python_version": platform.python_version()
+            "processes_running": self._pid_count,
+            "python_version": PYTHON_VERSION
         }
         
         # Get disk information
-        for partition in psutil.disk_partitions():
+        for partition in _partitions_cached(int(time.monotonic() // PARTITION_CACHE_SECONDS)):
             try:
                 usage = psutil.disk_usage(partition.mountpoint)
                 self.system_info["disk_usage"][partition.mountpoint] = {
@@ -49,31 +204,71 @@ class ResourceOptimizer:
         
         return self.system_info
     
+    def _collect_process_stats(self):
+        """Snapshot name, memory and CPU usage of every process in one pass"""
+        # With attrs, process_iter reads each process through as_dict() inside
+        # oneshot(), so name and memory come from a single /proc snapshot; denied
+        # values come back as None. CPU counters are primed in the same pass
+        procs = []
+        for proc in _iter_procs(['pid', 'name', 'memory_percent']):
+            try:
+                proc.cpu_percent(interval=None)
+            except psutil.NoSuchProcess:
+                continue
+            except psutil.AccessDenied:
+                pass
+            procs.append(proc)
+        
+        # The blocking system-wide sample doubles as the per-process interval
+        cpu_percent = psutil.cpu_percent(interval=1)
+        self._cpu_primed_at = time.monotonic()
+        self._cpu_sample = (cpu_percent, self._cpu_primed_at)
+        
+        stats = []
+        for proc in procs:
+            try:
+                cpu = proc.cpu_percent(interval=None)
+            except psutil.NoSuchProcess:
+                continue
+            except psutil.AccessDenied:
+                cpu = 0.0
+            stats.append({
+                'pid': proc.info['pid'],
+                'name': proc.info['name'],
+                'memory_percent': proc.info['memory_percent'] or 0,
+                'cpu_percent': cpu
+            })
+        
+        return stats
+    
     def optimize_memory(self):
         """Optimize memory usage"""
         optimizations = []
         
         # Clear Python's internal caches
         import gc
-        collected = gc.collect()
+        # With nothing promoted into the oldest generation since the last full pass, only
+        # the young generations are collected; cycles among long-lived objects that died
+        # since then wait for the interpreter's next full collection
+        collected = gc.collect(2) if gc.get_count()[2] > 0 else gc.collect(1)
         optimizations.append(f"Garbage collection freed {collected} objects")
         
         # Suggest closing memory-intensive processes
+        procs = self._procs if self._procs is not None else self._collect_process_stats()
+        
         memory_hogs = []
-        for proc in psutil.process_iter(['pid', 'name', 'memory_percent']):
-            try:
-                if proc.info['memory_percent'] > 5.0:  # Using more than 5% memory
-                    memory_hogs.append({
-                        'pid': proc.info['pid'],
-                        'name': proc.info['name'],
-                        'memory_percent': round(proc.info['memory_percent'], 2)
-                    })
-            except (psutil.NoSuchProcess, psutil.AccessDenied):
-                continue
+        for proc in procs:
+            if proc['memory_percent'] > 5.0:  # Using more than 5% memory
+                memory_hogs.append({
+                    'pid': proc['pid'],
+                    'name': proc['name'],
+                    'memory_percent': round(proc['memory_percent'], 2)
+                })
         
         if memory_hogs:
-            memory_hogs.sort(key=lambda x: x['memory_percent'], reverse=True)
-            optimizations.append(f"Top memory hogs: {[f'{h['name']}({h['memory_percent']}%)' for h in memory_hogs[:3]]}")
+            top = heapq.nlargest(3, memory_hogs, key=lambda x: x['memory_percent'])
+            top_hogs = ", ".join(f"{h['name']}({h['memory_percent']}%)" for h in top)
+            optimizations.append(f"Top memory hogs: {top_hogs}")
         
         return optimizations
     
@@ -82,35 +277,26 @@ class ResourceOptimizer:
         optimizations = []
         
         # Check CPU usage
-        cpu_percent = psutil.cpu_percent(interval=1)
+        procs = self._procs if self._procs is not None else self._collect_process_stats()
+        
+        cpu_percent = self._sample_cpu()
         if cpu_percent > 80:
             optimizations.append(f"High CPU usage detected: {cpu_percent}%")
             
             # Find CPU-intensive processes
             cpu_hogs = []
-            for proc in psutil.process_iter(['pid', 'name', 'cpu_percent']):
-                try:
-                    proc.cpu_percent(interval=0.1)
-                except (psutil.NoSuchProcess, psutil.AccessDenied):
-                    continue
-            
-            time.sleep(0.5)
-            
-            for proc in psutil.process_iter(['pid', 'name', 'cpu_percent']):
-                try:
-                    cpu = proc.cpu_percent(interval=0.1)
-                    if cpu > 10.0:  # Using more than 10% CPU
-                        cpu_hogs.append({
-                            'pid': proc.info['pid'],
-                            'name': proc.info['name'],
-                            'cpu_percent': round(cpu, 2)
-                        })
-                except (psutil.NoSuchProcess, psutil.AccessDenied):
-                    continue
+            for proc in procs:
+                if proc['cpu_percent'] > 10.0:  # Using more than 10% CPU
+                    cpu_hogs.append({
+                        'pid': proc['pid'],
+                        'name': proc['name'],
+                        'cpu_percent': round(proc['cpu_percent'], 2)
+                    })
             
             if cpu_hogs:
-                cpu_hogs.sort(key=lambda x: x['cpu_percent'], reverse=True)
-                optimizations.append(f"Top CPU hogs: {[f'{h['name']}({h['cpu_percent']}%)' for h in cpu_hogs[:3]]}")
+                top = heapq.nlargest(3, cpu_hogs, key=lambda x: x['cpu_percent'])
+                top_hogs = ", ".join(f"{h['name']}({h['cpu_percent']}%)" for h in top)
+                optimizations.append(f"Top CPU hogs: {top_hogs}")
         
         return optimizations
     
@@ -121,31 +307,22 @@ class ResourceOptimizer:
         for mountpoint, usage in self.system_info.get("disk_usage", {}).items():
             if usage["percent_used"] > 85:
                 optimizations.append(f"Disk {mountpoint} is {usage['percent_used']}% full. Consider cleaning up.")
+        
+        # Check for large files in temp directories. TEMP and TMP usually point at the
+        # same folder, so resolve and dedup them before walking anything
+        temp_dirs = [
+            os.environ.get('TEMP', ''),
+            os.environ.get('TMP', ''),
+            '/tmp' if not IS_WINDOWS else '',
+            'C:\\Windows\\Temp' if IS_WINDOWS else ''
+        ]
+        temp_dirs = dict.fromkeys(os.path.realpath(d) for d in temp_dirs if d and os.path.isdir(d))
+        
+        for temp_dir in temp_dirs:
+            temp_size, _ = _dir_size(temp_dir, limit=TEMP_REPORT_THRESHOLD, time_budget=TEMP_SCAN_SECONDS)
             
-            # Check for large files in temp directories
-            temp_dirs = [
-                os.environ.get('TEMP', ''),
-                os.environ.get('TMP', ''),
-                '/tmp' if platform.system() != 'Windows' else '',
-                'C:\\Windows\\Temp' if platform.system() == 'Windows' else ''
-            ]
-            
-            for temp_dir in temp_dirs:
-                if temp_dir and os.path.exists(temp_dir):
-                    try:
-                        temp_size = 0
-                        for root, dirs, files in os.walk(temp_dir):
-                            for file in files:
-                                try:
-                                    temp_size += os.path.getsize(os.path.join(root, file))
-                                except:
-                                    continue
-                        
-                        temp_size_gb = round(temp_size / (1024**3), 2)
-                        if temp_size_gb > 1.0:
-                            optimizations.append(f"Temp directory {temp_dir} has {temp_size_gb}GB of data")
-                    except:
-                        continue
+            if temp_size > TEMP_REPORT_THRESHOLD:
+                optimizations.append(f"Temp directory {temp_dir} has more than 1GB of data")
         
         return optimizations
     
@@ -153,17 +330,23 @@ class ResourceOptimizer:
         """Optimize network connections"""
         optimizations = []
         
-        # Check network connections
-        connections = psutil.net_connections()
-        established = [conn for conn in connections if conn.status == 'ESTABLISHED']
-        
-        optimizations.append(f"Active network connections: {len(established)}")
+        # Check network connections. Only TCP sockets can be ESTABLISHED, so UDP
+        # sockets are not even listed
+        suspicious_ports = frozenset((8080, 3000, 5000, 8000, 9000))  # Common dev ports
+        established = 0
+        dev_ports = []
+        for conn in psutil.net_connections(kind='tcp'):
+            if conn.status != psutil.CONN_ESTABLISHED:
+                continue
+            established += 1
+            
+            # Check for potentially problematic connections
+            if conn.raddr and conn.laddr.port in suspicious_ports:
+                dev_ports.append(conn.laddr.port)
         
-        # Check for potentially problematic connections
-        suspicious_ports = [8080, 3000, 5000, 8000, 9000]  # Common dev ports
-        for conn in established:
-            if conn.laddr.port in suspicious_ports and conn.raddr:
-                optimizations.append(f"Development service running on port {conn.laddr.port}")
+        optimizations.append(f"Active network connections: {established}")
+        for port in dev_ports:
+            optimizations.append(f"Development service running on port {port}")
         
         return optimizations
     
@@ -181,13 +364,21 @@ class ResourceOptimizer:
         if memory_mb > 500:  # If using more than 500MB
             optimizations.append("Python process using high memory. Consider optimizing imports.")
         
-        # Check for memory leaks
-        import gc
-        gc.set_debug(gc.DEBUG_SAVEALL)
+        # Check for memory leaks. DEBUG_SAVEALL keeps everything the collector frees
+        # in gc.garbage, so it is only switched on for the scan and then cleared
+        if self.debug_leaks:
+            import gc
+            gc.set_debug(gc.DEBUG_SAVEALL)
+            try:
+                gc.collect()
+                optimizations.append(f"Garbage collector found {len(gc.garbage)} objects in reference cycles")
+            finally:
+                gc.set_debug(0)
+                gc.garbage.clear()
         
         return optimizations
     
-    def generate_recommendations(self):
+    def generate_recommendations(self, cpu_percent=None):
         """Generate optimization recommendations"""
         recommendations = []
         
@@ -201,7 +392,8 @@ class ResourceOptimizer:
             })
         
         # CPU recommendations
-        cpu_percent = psutil.cpu_percent(interval=1)
+        if cpu_percent is None:
+            cpu_percent = self._sample_cpu()
         if cpu_percent > 80:
             recommendations.append({
                 "category": "CPU",
@@ -221,16 +413,27 @@ class ResourceOptimizer:
                 })
         
         # General recommendations
-        if len(psutil.pids()) > 150:
+        if self._pid_count is None:
+            self._pid_count = _count_processes()
+        
+        if self._pid_count > 150:
             recommendations.append({
                 "category": "System",
                 "priority": "Medium",
                 "action": "Reduce number of running processes",
-                "details": f"{len(psutil.pids())} processes running"
+                "details": f"{self._pid_count} processes running"
             })
         
         return recommendations
     
+    def _report_section(self, heading, optimizations):
+        """Record a section's optimizations and print them in a single write"""
+        if not optimizations:
+            return
+        
+        self.optimizations_applied.extend(optimizations)
+        sys.stdout.write(heading + "\n" + "".join(f"  • {opt}\n" for opt in optimizations))
+    
     def run_optimization(self, full_scan=True):
         """Run complete optimization"""
         print("=" * 60)
@@ -252,45 +455,31 @@ class ResourceOptimizer:
             print("\n⚡ RUNNING OPTIMIZATIONS:")
             print("-" * 40)
             
-            # Memory optimization
-            mem_opt = self.optimize_memory()
-            if mem_opt:
-                print("🧠 Memory Optimizations:")
-                for opt in mem_opt:
-                    print(f"  • {opt}")
-                    self.optimizations_applied.append(opt)
-            
-            # CPU optimization
-            cpu_opt = self.optimize_cpu()
-            if cpu_opt:
-                print("\n⚡ CPU Optimizations:")
-                for opt in cpu_opt:
-                    print(f"  • {opt}")
-                    self.optimizations_applied.append(opt)
+            # One process table scan feeds both the memory and CPU checks; it is
+            # dropped afterwards so standalone calls later on take a fresh one
+            self._procs = self._collect_process_stats()
+            try:
+                # Memory optimization
+                mem_opt = self.optimize_memory()
+                self._report_section("🧠 Memory Optimizations:", mem_opt)
+                
+                # CPU optimization
+                cpu_opt = self.optimize_cpu()
+                self._report_section("\n⚡ CPU Optimizations:", cpu_opt)
+            finally:
+                self._procs = None
             
             # Disk optimization
             disk_opt = self.optimize_disk()
-            if disk_opt:
-                print("\n💾 Disk Optimizations:")
-                for opt in disk_opt:
-                    print(f"  • {opt}")
-                    self.optimizations_applied.append(opt)
+            self._report_section("\n💾 Disk Optimizations:", disk_opt)
             
             # Network optimization
             net_opt = self.optimize_network()
-            if net_opt:
-                print("\n🌐 Network Optimizations:")
-                for opt in net_opt:
-                    print(f"  • {opt}")
-                    self.optimizations_applied.append(opt)
+            self._report_section("\n🌐 Network Optimizations:", net_opt)
             
             # Python runtime optimization
             py_opt = self.optimize_python_runtime()
-            if py_opt:
-                print("\n🐍 Python Runtime Optimizations:")
-                for opt in py_opt:
-                    print(f"  • {opt}")
-                    self.optimizations_applied.append(opt)
+            self._report_section("\n🐍 Python Runtime Optimizations:", py_opt)
         
         # Generate recommendations
         print("\n💡 RECOMMENDATIONS:")
@@ -306,7 +495,7 @@ class ResourceOptimizer:
                 print(f"   Reason: {rec['details']}")
         
         # Save log
-        self.save_log()
+        self.save_log(recommendations)
         
         print("\n" + "=" * 60)
         print(f"Optimization completed at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
@@ -314,20 +503,45 @@ class ResourceOptimizer:
         
         return self.optimizations_applied
     
-    def save_log(self):
+    def save_log(self, recommendations=None):
         """Save optimization log to file"""
+        if recommendations is None:
+            recommendations = self.generate_recommendations()
+        
+        # Snapshots: the writer thread may still be serializing when the next run
+        # extends optimizations_applied or refills system_info
         log_data = {
             "timestamp": datetime.now().isoformat(),
-            "system_info": self.system_info,
-            "optimizations_applied": self.optimizations_applied,
-            "recommendations": self.generate_recommendations()
+            "system_info": dict(self.system_info),
+            "optimizations_applied": list(self.optimizations_applied),
+            "recommendations": recommendations
         }
         
-        try:
-            with open(self.log_file, 'w') as f:
-                json.dump(log_data, f, indent=2)
-        except:
-            pass
+        # Serializing and writing happen on a background thread; queued logs are
+        # still flushed before the interpreter exits
+        with self._log_writer_lock:
+            if self._log_writer is None:
+                self._log_writer = Thread(target=self._write_logs, daemon=True)
+                self._log_writer.start()
+                atexit.register(self._log_queue.join)
+        
+        self._log_queue.put((self.log_file, log_data))
+    
+    def _write_logs(self):
+        """Write queued logs, replacing the file atomically"""
+        while True:
+            log_file, log_data = self._log_queue.get()
+            try:
+                tmp_file = log_file + '.tmp'
+                with open(tmp_file, 'wb') as f:
+                    f.write(_dumps(log_data))
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_file, log_file)
+            except:
+                pass
+            finally:
+                self._log_queue.task_done()
     
     def quick_scan(self):
         """Perform a quick system scan"""
@@ -335,36 +549,165 @@ class ResourceOptimizer:
     
     def monitor_resources(self, interval=5, duration=60):
         """Monitor resources for a period"""
+        if interval <= 0:
+            raise ValueError("Sample interval must be positive")
+        
         print(f"\n📈 Monitoring resources for {duration} seconds...")
         print("-" * 40)
         
-        end_time = time.time() + duration
-        samples = []
-        
-        while time.time() < end_time:
-            sample = {
-                "time": datetime.now().strftime("%H:%M:%S"),
-                "cpu_percent": psutil.cpu_percent(interval=1),
-                "ram_percent": psutil.virtual_memory().percent,
-                "available_ram_gb": round(psutil.virtual_memory().available / (1024**3), 2)
-            }
-            samples.append(sample)
-            
-            print(f"[{sample['time']}] CPU: {sample['cpu_percent']}% | RAM: {sample['ram_percent']}% | Available: {sample['available_ram_gb']}GB")
-            time.sleep(interval)
+        # Running statistics (Welford's method) so memory stays constant however
+        # long the monitor runs
+        n = 0
+        avg_cpu = avg_ram = 0.0
+        cpu_m2 = 0.0
+        
+        # Prime the CPU counter so each non-blocking read covers the time since the
+        # previous tick. Ticks are anchored to the monotonic clock rather than slept
+        # between, so sampling work never pushes the schedule back
+        psutil.cpu_percent(interval=None)
+        next_tick = time.monotonic()
+        end_time = next_tick + duration
+        
+        # Where the OS offers timerfd (Linux, Python 3.13+) the kernel keeps the cadence
+        timer_fd = None
+        if hasattr(os, 'timerfd_create'):
+            timer_fd = os.timerfd_create(time.CLOCK_MONOTONIC)
+            os.timerfd_settime(timer_fd, initial=interval, interval=interval)
+        
+        try:
+            while True:
+                next_tick += interval
+                if next_tick >= end_time:
+                    # Last tick lands on the end of the window, not a full interval past it
+                    next_tick = end_time
+                    time.sleep(max(0, end_time - time.monotonic()))
+                elif timer_fd is not None:
+                    os.read(timer_fd, 8)
+                else:
+                    time.sleep(max(0, next_tick - time.monotonic()))
+                
+                vm = psutil.virtual_memory()
+                sample = {
+                    "time": datetime.now().strftime("%H:%M:%S"),
+                    "cpu_percent": psutil.cpu_percent(interval=None),
+                    "ram_percent": vm.percent,
+                    "available_ram_gb": round(vm.available / (1024**3), 2)
+                }
+                n += 1
+                delta = sample["cpu_percent"] - avg_cpu
+                avg_cpu += delta / n
+                cpu_m2 += delta * (sample["cpu_percent"] - avg_cpu)
+                avg_ram += (sample["ram_percent"] - avg_ram) / n
+                
+                print(f"[{sample['time']}] CPU: {sample['cpu_percent']}% | RAM: {sample['ram_percent']}% | Available: {sample['available_ram_gb']}GB")
+                
+                if next_tick >= end_time or time.monotonic() >= end_time:
+                    break
+        finally:
+            if timer_fd is not None:
+                os.close(timer_fd)
         
         # Analyze samples
-        avg_cpu = sum(s["cpu_percent"] for s in samples) / len(samples)
-        avg_ram = sum(s["ram_percent"] for s in samples) / len(samples)
+        cpu_stddev = (cpu_m2 / n) ** 0.5
         
         print("\n📊 MONITORING SUMMARY:")
-        print(f"Average CPU Usage: {avg_cpu:.1f}%")
+        print(f"Average CPU Usage: {avg_cpu:.1f}% (±{cpu_stddev:.1f})")
         print(f"Average RAM Usage: {avg_ram:.1f}%")
         
         if avg_cpu > 70:
             print("⚠️  High average CPU usage detected")
         if avg_ram > 80:
             print("⚠️  High average RAM usage detected")
+    
+    def _get_connection(self):
+        """Shared connection for budget queries; callers hold _db_lock"""
+        if self._conn is None:
+            # One long-lived connection keeps sqlite3's prepared statement cache warm
+            conn = sqlite3.connect(self.db_path, isolation_level=None, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            try:
+                conn.execute('''
+                    CREATE INDEX IF NOT EXISTS idx_ad_campaigns_vendor_status
+                    ON ad_campaigns(vendor_id, status)
+                ''')
+            except sqlite3.OperationalError:
+                pass  # Schema not created yet
+            self._conn = conn
+        return self._conn
+    
+    def optimize_budget_allocation(self, vendor_id):
+        """Split a vendor's budget across ad platforms by historical ROI"""
+        with self._db_lock:
+            conn = self._get_connection()
+            
+            # Vendor budget and per-platform campaign history in one round trip
+            rows = conn.execute('''
+                SELECT
+                    v.budget AS vendor_budget,
+                    c.platform,
+                    SUM(c.budget) AS spent,
+                    AVG(json_extract(c.performance_metrics, '$.estimated_roi')) AS roi
+                FROM vendor_profiles v
+                LEFT JOIN ad_campaigns c
+                    ON c.vendor_id = v.vendor_id AND c.status = 'completed'
+                WHERE v.vendor_id = ?
+                GROUP BY c.platform
+            ''', (vendor_id,)).fetchall()
+        
+        if not rows:
+            return {}
+        
+        total_budget = rows[0]['vendor_budget'] or 0
+        history = [row for row in rows if row['platform'] is not None]
+        
+        allocation = {}
+        recommendations = []
+        
+        if not history:
+            share = 1 / len(DEFAULT_AD_PLATFORMS)
+            for platform in DEFAULT_AD_PLATFORMS:
+                allocation[platform] = {
+                    'percentage': round(share * 100, 1),
+                    'amount': round(total_budget * share, 2),
+                    'historical_roi': None
+                }
+            recommendations.append("No completed campaigns yet. Start with an even split and rebalance once ROI data comes in.")
+        else:
+            platforms = [row['platform'] for row in history]
+            spent = np.array([row['spent'] or 100 for row in history], dtype=np.float64)
+            roi = np.array([row['roi'] or 0 for row in history], dtype=np.float64)
+            
+            # Weight each platform by ROI scaled with how much was spent to earn it
+            weights = np.where(roi > 0, roi * spent, 0.0)
+            total_weight = weights.sum()
+            if total_weight > 0:
+                shares = weights / total_weight
+            else:
+                shares = np.full(len(history), 1 / len(history))
+            
+            percentages = np.round(shares * 100, 1).tolist()
+            amounts = np.round(shares * total_budget, 2).tolist()
+            rois = np.round(roi, 2).tolist()
+            for i, platform in enumerate(platforms):
+                allocation[platform] = {
+                    'percentage': percentages[i],
+                    'amount': amounts[i],
+                    'historical_roi': rois[i]
+                }
+            
+            for i in np.flatnonzero(roi <= 0):
+                recommendations.append(f"Pause or rework campaigns on {platforms[i]}; they have not returned a positive ROI.")
+            
+            best = int(np.argmax(roi))
+            if roi[best] > 0:
+                recommendations.append(f"Prioritize {platforms[best]}, which has the best historical ROI ({rois[best]}).")
+        
+        return {
+            'vendor_id': vendor_id,
+            'total_budget': total_budget,
+            'allocation': allocation,
+            'recommendations': recommendations
+        }
 
 
 def main():
@@ -1,5 +1,6 @@
-import requests
 import json
+import urllib3
+from concurrent.futures import ThreadPoolExecutor
 
 # Test AI endpoints
 endpoints = [
@@ -9,14 +10,29 @@ endpoints = [
     "http://127.0.0.1:5000/api/ai/categories"
 ]
 
-for url in endpoints:
+# One thread-safe keep-alive pool (urllib3 ships with requests) shared by every
+# worker, with a connection per endpoint so the requests run concurrently
+http = urllib3.PoolManager(num_pools=1, maxsize=len(endpoints), block=True)
+
+def fetch(url):
+    try:
+        return http.request("GET", url, timeout=5.0, retries=False)
+    except Exception as e:
+        return e
+
+with ThreadPoolExecutor(max_workers=len(endpoints)) as pool:
+    results = list(pool.map(fetch, endpoints))
+http.clear()
+
+for url, result in zip(endpoints, results):
     print(f"\n{'='*60}")
     print(f"Testing: {url}")
     print('='*60)
     try:
-        response = requests.get(url, timeout=5)
-        print(f"Status: {response.status_code}")
+        if isinstance(result, Exception):
+            raise result
+        print(f"Status: {result.status}")
         print("Response:")
-        print(json.dumps(response.json(), indent=2))
+        print(json.dumps(json.loads(result.data), indent=2))
     except Exception as e:
         print(f"Error: {e}")
\ No newline at end of file
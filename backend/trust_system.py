@@ -1,198 +1,230 @@
 import sqlite3
+import threading
+import atexit
 from datetime import datetime, timedelta
 
+from db_pool import get_pool
+
+# Response keys for the review and event rows of TRUST_REPORT_SQL, in column order
+REVIEW_FIELDS = ('rating', 'comment', 'reviewer', 'date')
+EVENT_FIELDS = ('type', 'impact', 'description', 'date')
+
+# Indexes behind the score and report queries; the collaboration and campaign ones
+# cover the rate subqueries so they never touch the table b-trees
+TRUST_INDEXES = [
+    'CREATE INDEX IF NOT EXISTS idx_reviews_vendor_rating ON reviews(vendor_id, rating)',
+    'CREATE INDEX IF NOT EXISTS idx_events_vendor_time ON trust_events(vendor_id, created_at DESC)',
+    'CREATE INDEX IF NOT EXISTS idx_collab_v1_status ON collaborations(vendor1_id, status)',
+    'CREATE INDEX IF NOT EXISTS idx_collab_v2_status ON collaborations(vendor2_id, status)',
+    'CREATE INDEX IF NOT EXISTS idx_ad_campaigns_vendor_status ON ad_campaigns(vendor_id, status)',
+]
+
+# Score, last 5 reviews and last 10 events as one tagged result set
+TRUST_REPORT_SQL = '''
+    SELECT 'score', score, reliability, NULL, NULL
+    FROM trust_scores WHERE vendor_id = ?1
+    UNION ALL
+    SELECT * FROM (
+        SELECT 'review', r.rating, r.comment, u.username, r.created_at
+        FROM reviews r
+        JOIN users u ON r.reviewer_id = u.id
+        WHERE r.vendor_id = ?1
+        ORDER BY r.created_at DESC
+        LIMIT 5
+    )
+    UNION ALL
+    SELECT * FROM (
+        SELECT 'event', event_type, impact, description, created_at
+        FROM trust_events
+        WHERE vendor_id = ?1
+        ORDER BY created_at DESC
+        LIMIT 10
+    )
+'''
+
+# Reviews and events arriving within this window share one score recalculation
+SCORE_DEBOUNCE_SECONDS = 0.5
+
+# Rates and the average rating come from correlated subqueries so the whole score is
+# computed and stored in one statement. Weights: 30% collaboration success, 10% reviews
+# (avg 3-5 = 30-50), 20% campaign completion, 40 base; clamped to 0-100
+TRUST_SCORE_SQL = '''
+    INSERT OR REPLACE INTO trust_scores
+    (vendor_id, score, reliability, completion_rate, last_updated)
+    SELECT ?1,
+           MIN(MAX(collab_rate * 30 + avg_rating * 10 + campaign_rate * 20 + 40, 0), 100),
+           collab_rate, campaign_rate, CURRENT_TIMESTAMP
+    FROM (
+        SELECT
+            (SELECT COALESCE(CAST(SUM(status = 'completed') AS REAL) / NULLIF(COUNT(*), 0), 0)
+             FROM collaborations WHERE vendor1_id = ?1 OR vendor2_id = ?1) AS collab_rate,
+            (SELECT COALESCE(AVG(rating), 3.0)
+             FROM reviews WHERE vendor_id = ?1) AS avg_rating,
+            (SELECT COALESCE(CAST(SUM(status = 'completed') AS REAL) / NULLIF(COUNT(*), 0), 0)
+             FROM ad_campaigns WHERE vendor_id = ?1) AS campaign_rate
+    )
+    RETURNING score
+'''
+
 class TrustSystem:
+    # Database paths whose tables and indexes this process has already created
+    _initialized = set()
+    _init_lock = threading.Lock()
+    
     def __init__(self, db_path='platform.db'):
         self.db_path = db_path
-        self.init_db()
+        self.pool = get_pool(db_path)
+        self._dirty = set()
+        self._dirty_lock = threading.Lock()
+        self._flush_timer = None
+        with TrustSystem._init_lock:
+            if db_path not in TrustSystem._initialized:
+                self.init_db()
+        atexit.register(self.flush_trust_scores)
     
     def init_db(self):
         """Initialize trust system tables"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS trust_scores (
-                vendor_id INTEGER PRIMARY KEY,
-                score INTEGER DEFAULT 50,
-                reliability DECIMAL(3,2) DEFAULT 0.5,
-                response_time DECIMAL(5,2),
-                completion_rate DECIMAL(5,2),
-                last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (vendor_id) REFERENCES vendor_profiles(vendor_id)
-            )
-        ''')
-        
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS trust_events (
-                event_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                vendor_id INTEGER,
-                event_type VARCHAR(50),
-                impact INTEGER,
-                description TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (vendor_id) REFERENCES vendor_profiles(vendor_id)
-            )
-        ''')
-        
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS reviews (
-                review_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                reviewer_id INTEGER,
-                vendor_id INTEGER,
-                rating INTEGER CHECK(rating >= 1 AND rating <= 5),
-                comment TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (reviewer_id) REFERENCES users(id),
-                FOREIGN KEY (vendor_id) REFERENCES vendor_profiles(vendor_id)
-            )
-        ''')
-        
-        conn.commit()
-        conn.close()
+        with self.pool.acquire() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS trust_scores (
+                    vendor_id INTEGER PRIMARY KEY,
+                    score INTEGER DEFAULT 50,
+                    reliability DECIMAL(3,2) DEFAULT 0.5,
+                    response_time DECIMAL(5,2),
+                    completion_rate DECIMAL(5,2),
+                    last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    FOREIGN KEY (vendor_id) REFERENCES vendor_profiles(vendor_id)
+                )
+            ''')
+            
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS trust_events (
+                    event_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    vendor_id INTEGER,
+                    event_type VARCHAR(50),
+                    impact INTEGER,
+                    description TEXT,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    FOREIGN KEY (vendor_id) REFERENCES vendor_profiles(vendor_id)
+                )
+            ''')
+            
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS reviews (
+                    review_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    reviewer_id INTEGER,
+                    vendor_id INTEGER,
+                    rating INTEGER CHECK(rating >= 1 AND rating <= 5),
+                    comment TEXT,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    FOREIGN KEY (reviewer_id) REFERENCES users(id),
+                    FOREIGN KEY (vendor_id) REFERENCES vendor_profiles(vendor_id)
+                )
+            ''')
+            
+            complete = True
+            for statement in TRUST_INDEXES:
+                try:
+                    cursor.execute(statement)
+                except sqlite3.OperationalError:
+                    complete = False  # Table owned by another module not created yet
+        
+        # Retried by the next instance until every index exists
+        if complete:
+            TrustSystem._initialized.add(self.db_path)
     
     def calculate_trust_score(self, vendor_id):
         """Calculate comprehensive trust score for a vendor"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Get collaboration success rate
-        cursor.execute('''
-            SELECT 
-                COUNT(*) as total,
-                SUM(CASE WHEN status = 'completed' THEN 1 ELSE 0 END) as completed
-            FROM collaborations 
-            WHERE vendor1_id = ? OR vendor2_id = ?
-        ''', (vendor_id, vendor_id))
-        
-        collab_result = cursor.fetchone()
-        collab_rate = collab_result[1] / collab_result[0] if collab_result[0] > 0 else 0
-        
-        # Get average review rating
-        cursor.execute('''
-            SELECT AVG(rating) FROM reviews WHERE vendor_id = ?
-        ''', (vendor_id,))
-        
-        avg_rating = cursor.fetchone()[0] or 3.0
-        
-        # Get campaign completion rate
-        cursor.execute('''
-            SELECT 
-                COUNT(*) as total,
-                SUM(CASE WHEN status = 'completed' THEN 1 ELSE 0 END) as completed
-            FROM ad_campaigns WHERE vendor_id = ?
-        ''', (vendor_id,))
-        
-        campaign_result = cursor.fetchone()
-        campaign_rate = campaign_result[1] / campaign_result[0] if campaign_result[0] > 0 else 0
+        with self.pool.acquire() as conn:
+            row = conn.execute(TRUST_SCORE_SQL, (vendor_id,)).fetchone()
         
-        # Calculate weighted trust score
-        score = (
-            (collab_rate * 30) +          # 30% collaboration success
-            (avg_rating * 10) +           # 10% reviews (avg 3-5 = 30-50)
-            (campaign_rate * 20) +        # 20% campaign completion
-            40                            # 40% base score
-        )
-        
-        # Normalize to 0-100
-        score = min(max(score, 0), 100)
-        
-        # Update trust score
-        cursor.execute('''
-            INSERT OR REPLACE INTO trust_scores 
-            (vendor_id, score, reliability, completion_rate, last_updated)
-            VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
-        ''', (vendor_id, score, collab_rate, campaign_rate))
-        
-        conn.commit()
-        conn.close()
-        
-        return score
+        return row[0]
+    
+    def schedule_trust_score(self, vendor_id):
+        """Mark a vendor's score stale and recalculate it after the debounce window"""
+        with self._dirty_lock:
+            self._dirty.add(vendor_id)
+            if self._flush_timer is None:
+                self._flush_timer = threading.Timer(SCORE_DEBOUNCE_SECONDS, self.flush_trust_scores)
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+    
+    def flush_trust_scores(self):
+        """Recalculate every score marked stale since the last flush"""
+        with self._dirty_lock:
+            dirty, self._dirty = self._dirty, set()
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+        
+        if dirty:
+            with self.pool.acquire() as conn:
+                conn.execute('BEGIN IMMEDIATE')
+                for vendor_id in dirty:
+                    conn.execute(TRUST_SCORE_SQL, (vendor_id,)).fetchall()
+                conn.execute('COMMIT')
+        return len(dirty)
     
     def add_trust_event(self, vendor_id, event_type, impact, description):
         """Record a trust-affecting event"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT INTO trust_events (vendor_id, event_type, impact, description)
-            VALUES (?, ?, ?, ?)
-        ''', (vendor_id, event_type, impact, description))
+        with self.pool.acquire() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute('''
+                INSERT INTO trust_events (vendor_id, event_type, impact, description)
+                VALUES (?, ?, ?, ?)
+            ''', (vendor_id, event_type, impact, description))
         
         # Recalculate trust score
-        self.calculate_trust_score(vendor_id)
-        
-        conn.commit()
-        conn.close()
+        self.schedule_trust_score(vendor_id)
     
     def add_review(self, reviewer_id, vendor_id, rating, comment):
         """Add a review for a vendor"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT INTO reviews (reviewer_id, vendor_id, rating, comment)
-            VALUES (?, ?, ?, ?)
-        ''', (reviewer_id, vendor_id, rating, comment))
+        with self.pool.acquire() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute('''
+                INSERT INTO reviews (reviewer_id, vendor_id, rating, comment)
+                VALUES (?, ?, ?, ?)
+            ''', (reviewer_id, vendor_id, rating, comment))
         
         # Recalculate trust score
-        self.calculate_trust_score(vendor_id)
-        
-        conn.commit()
-        conn.close()
+        self.schedule_trust_score(vendor_id)
         return cursor.lastrowid
     
     def get_vendor_trust_report(self, vendor_id):
         """Get comprehensive trust report for a vendor"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Get trust score
-        cursor.execute('SELECT * FROM trust_scores WHERE vendor_id = ?', (vendor_id,))
-        trust_data = cursor.fetchone()
-        
-        # Get recent reviews
-        cursor.execute('''
-            SELECT r.rating, r.comment, u.username, r.created_at
-            FROM reviews r
-            JOIN users u ON r.reviewer_id = u.id
-            WHERE r.vendor_id = ?
-            ORDER BY r.created_at DESC
-            LIMIT 5
-        ''', (vendor_id,))
-        
-        reviews = cursor.fetchall()
-        
-        # Get recent trust events
-        cursor.execute('''
-            SELECT event_type, impact, description, created_at
-            FROM trust_events
-            WHERE vendor_id = ?
-            ORDER BY created_at DESC
-            LIMIT 10
-        ''', (vendor_id,))
-        
-        events = cursor.fetchall()
-        
-        conn.close()
+        with self._dirty_lock:
+            stale = vendor_id in self._dirty
+            self._dirty.discard(vendor_id)
+        if stale:
+            self.calculate_trust_score(vendor_id)
+        
+        trust_data = None
+        reviews = []
+        events = []
+        
+        with self.pool.acquire() as conn:
+            # Plain tuples; each row is turned into its response dict directly below
+            cursor = conn.cursor()
+            cursor.row_factory = None
+            rows = cursor.execute(TRUST_REPORT_SQL, (vendor_id,)).fetchall()
+        
+        # One pass over the tagged rows, building the response dicts as it goes
+        for row in rows:
+            tag = row[0]
+            if tag == 'score':
+                trust_data = row
+            elif tag == 'review':
+                reviews.append(dict(zip(REVIEW_FIELDS, row[1:])))
+            else:
+                events.append(dict(zip(EVENT_FIELDS, row[1:])))
         
         return {
             'trust_score': trust_data[1] if trust_data else 50,
             'reliability': trust_data[2] if trust_data else 0.5,
-            'reviews': [
-                {
-                    'rating': r[0],
-                    'comment': r[1],
-                    'reviewer': r[2],
-                    'date': r[3]
-                } for r in reviews
-            ],
-            'recent_events': [
-                {
-                    'type': e[0],
-                    'impact': e[1],
-                    'description': e[2],
-                    'date': e[3]
-                } for e in events
-            ]
+            'reviews': reviews,
+            'recent_events': events
         }
\ No newline at end of file
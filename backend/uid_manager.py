@@ -1,59 +1,125 @@
 import sqlite3
 import hashlib
+import hmac
+import os
 import uuid
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime
 
+from db_pool import get_pool
+
+# scrypt cost parameters (~16MB and a few tens of ms per hash)
+SCRYPT_N = 2 ** 14
+SCRYPT_R = 8
+SCRYPT_P = 1
+
+# Successful credential checks are reused for this long, so a password changed or an
+# account removed elsewhere (another worker, the DB directly) stops working within the TTL
+AUTH_CACHE_SIZE = 1024
+AUTH_CACHE_TTL = 30  # seconds
+
+# Hot-path statements, shared as module constants so every pooled connection's
+# statement cache hits on the same text
+VALIDATE_SESSION_SQL = '''
+    SELECT u.id, u.username, u.user_type
+    FROM sessions s
+    JOIN users u ON s.user_id = u.id
+    WHERE s.session_id = ? AND s.expires_at > CURRENT_TIMESTAMP
+'''
+
+LOOKUP_USER_SQL = '''
+    SELECT id, username, user_type, password_hash, password_salt
+    FROM users WHERE email = ?
+'''
+
+def uuid7():
+    """Time-ordered UUID (version 7): 48-bit millisecond timestamp, then 74 random bits"""
+    value = (time.time_ns() // 1_000_000) << 80 | int.from_bytes(os.urandom(10), 'big')
+    value = value & ~(0xF << 76) | (0x7 << 76)  # version 7
+    value = value & ~(0x3 << 62) | (0x2 << 62)  # RFC 4122 variant
+    return uuid.UUID(int=value)
+
+def prehash_password(password):
+    """SHA-256 hex digest of the raw password - the form the KDF and caches see"""
+    return hashlib.sha256(password.encode()).hexdigest()
+
+def hash_password(digest, salt):
+    """Salted scrypt hash of a prehashed password"""
+    return hashlib.scrypt(digest.encode(), salt=bytes.fromhex(salt),
+                          n=SCRYPT_N, r=SCRYPT_R, p=SCRYPT_P).hex()
+
 class UIDManager:
+    # Database paths whose tables this process has already created
+    _initialized = set()
+    _init_lock = threading.Lock()
+    
     def __init__(self, db_path='platform.db'):
         self.db_path = db_path
-        self.init_db()
+        self.pool = get_pool(db_path)
+        # (email, prehashed password) -> (expires_at, user); never holds the raw password
+        self._auth_cache = OrderedDict()
+        self._auth_cache_lock = threading.Lock()
+        with UIDManager._init_lock:
+            if db_path not in UIDManager._initialized:
+                self.init_db()
     
     def init_db(self):
         """Initialize database with users table"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS users (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                username VARCHAR(50) UNIQUE NOT NULL,
-                email VARCHAR(100) UNIQUE NOT NULL,
-                password_hash VARCHAR(255) NOT NULL,
-                user_type VARCHAR(20) DEFAULT 'vendor',
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                last_login TIMESTAMP
-            )
-        ''')
-        
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS sessions (
-                session_id VARCHAR(255) PRIMARY KEY,
-                user_id INTEGER,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                expires_at TIMESTAMP,
-                FOREIGN KEY (user_id) REFERENCES users(id)
-            )
-        ''')
+        with self.pool.acquire() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS users (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    username VARCHAR(50) UNIQUE NOT NULL,
+                    email VARCHAR(100) UNIQUE NOT NULL,
+                    password_hash VARCHAR(255) NOT NULL,
+                    password_salt VARCHAR(32),
+                    user_type VARCHAR(20) DEFAULT 'vendor',
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    last_login TIMESTAMP
+                )
+            ''')
+            
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS sessions (
+                    session_id VARCHAR(255) PRIMARY KEY,
+                    user_id INTEGER,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    expires_at TIMESTAMP,
+                    FOREIGN KEY (user_id) REFERENCES users(id)
+                )
+            ''')
+            
+            # Databases created before salted hashes; NULL salt marks a legacy SHA-256 row
+            columns = {row[1] for row in cursor.execute('PRAGMA table_info(users)')}
+            if 'password_salt' not in columns:
+                cursor.execute('ALTER TABLE users ADD COLUMN password_salt VARCHAR(32)')
         
-        conn.commit()
-        conn.close()
+        UIDManager._initialized.add(self.db_path)
     
     def create_user(self, username, email, password, user_type='vendor'):
         """Create a new user"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
         # Hash password
-        password_hash = hashlib.sha256(password.encode()).hexdigest()
+        salt = os.urandom(16).hex()
+        password_hash = hash_password(prehash_password(password), salt)
         
-        try:
-            cursor.execute('''
-                INSERT INTO users (username, email, password_hash, user_type)
-                VALUES (?, ?, ?, ?)
-            ''', (username, email, password_hash, user_type))
+        with self.pool.acquire() as conn:
+            cursor = conn.cursor()
+            cursor.execute('BEGIN IMMEDIATE')
+            
+            try:
+                cursor.execute('''
+                    INSERT INTO users (username, email, password_hash, password_salt, user_type)
+                    VALUES (?, ?, ?, ?, ?)
+                ''', (username, email, password_hash, salt, user_type))
+            except sqlite3.IntegrityError:
+                cursor.execute('ROLLBACK')
+                return None
             
             user_id = cursor.lastrowid
-            conn.commit()
             
             # Create initial vendor profile
             if user_type == 'vendor':
@@ -61,70 +127,87 @@ class UIDManager:
                     INSERT INTO vendor_profiles (user_id, business_name)
                     VALUES (?, ?)
                 ''', (user_id, f"{username}'s Business"))
-                conn.commit()
             
-            conn.close()
-            return user_id
-        except sqlite3.IntegrityError:
-            conn.close()
-            return None
+            cursor.execute('COMMIT')
+        
+        return user_id
     
     def authenticate_user(self, email, password):
         """Authenticate user login"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        password_hash = hashlib.sha256(password.encode()).hexdigest()
-        
-        cursor.execute('''
-            SELECT id, username, user_type FROM users 
-            WHERE email = ? AND password_hash = ?
-        ''', (email, password_hash))
-        
-        user = cursor.fetchone()
+        user = self._lookup_user(email, prehash_password(password))
+        if not user:
+            return None
         
-        if user:
+        with self.pool.acquire() as conn:
+            cursor = conn.cursor()
+            cursor.execute('BEGIN IMMEDIATE')
+            
             # Update last login
             cursor.execute('''
                 UPDATE users 
                 SET last_login = CURRENT_TIMESTAMP 
                 WHERE id = ?
             ''', (user[0],))
-            conn.commit()
             
-            # Create session
-            session_id = str(uuid.uuid4())
+            # Create session; time-ordered ids append to the end of the sessions primary key
+            session_id = str(uuid7())
             cursor.execute('''
                 INSERT INTO sessions (session_id, user_id, expires_at)
                 VALUES (?, ?, datetime('now', '+7 days'))
             ''', (session_id, user[0]))
-            conn.commit()
+            cursor.execute('COMMIT')
+        
+        return {
+            'user_id': user[0],
+            'username': user[1],
+            'user_type': user[2],
+            'session_id': session_id
+        }
+    
+    def _lookup_user(self, email, digest):
+        """_query_user behind a TTL LRU; failed lookups are never cached"""
+        key = (email, digest)
+        now = time.monotonic()
+        with self._auth_cache_lock:
+            cached = self._auth_cache.get(key)
+            if cached and cached[0] > now:
+                self._auth_cache.move_to_end(key)
+                return cached[1]
+        
+        user = self._query_user(email, digest)
+        if user:
+            with self._auth_cache_lock:
+                self._auth_cache[key] = (now + AUTH_CACHE_TTL, user)
+                self._auth_cache.move_to_end(key)
+                if len(self._auth_cache) > AUTH_CACHE_SIZE:
+                    self._auth_cache.popitem(last=False)
+        return user
+    
+    def _query_user(self, email, digest):
+        """(id, username, user_type) for matching credentials, or None"""
+        with self.pool.acquire() as conn:
+            user = conn.execute(LOOKUP_USER_SQL, (email,)).fetchone()
             
-            conn.close()
-            return {
-                'user_id': user[0],
-                'username': user[1],
-                'user_type': user[2],
-                'session_id': session_id
-            }
-        
-        conn.close()
-        return None
+            if not user:
+                return None
+            
+            if user['password_salt']:
+                valid = hmac.compare_digest(hash_password(digest, user['password_salt']), user['password_hash'])
+            else:
+                # Legacy unsalted SHA-256 row - upgrade it to scrypt on a successful login
+                valid = hmac.compare_digest(digest, user['password_hash'])
+                if valid:
+                    salt = os.urandom(16).hex()
+                    conn.execute('''
+                        UPDATE users SET password_hash = ?, password_salt = ? WHERE id = ?
+                    ''', (hash_password(digest, salt), salt, user['id']))
+        
+        return (user['id'], user['username'], user['user_type']) if valid else None
     
     def validate_session(self, session_id):
         """Validate user session"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT u.id, u.username, u.user_type 
-            FROM sessions s
-            JOIN users u ON s.user_id = u.id
-            WHERE s.session_id = ? AND s.expires_at > CURRENT_TIMESTAMP
-        ''', (session_id,))
-        
-        user = cursor.fetchone()
-        conn.close()
+        with self.pool.acquire() as conn:
+            user = conn.execute(VALIDATE_SESSION_SQL, (session_id,)).fetchone()
         
         if user:
             return {
@@ -136,16 +219,15 @@ class UIDManager:
     
     def get_user_profile(self, user_id):
         """Get user profile information"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT id, username, email, user_type, created_at, last_login
-            FROM users WHERE id = ?
-        ''', (user_id,))
-        
-        user = cursor.fetchone()
-        conn.close()
+        with self.pool.acquire() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute('''
+                SELECT id, username, email, user_type, created_at, last_login
+                FROM users WHERE id = ?
+            ''', (user_id,))
+            
+            user = cursor.fetchone()
         
         if user:
             return {
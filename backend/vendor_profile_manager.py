@@ -1,96 +1,173 @@
 from flask import jsonify
 import sqlite3
 import json
+import time
+import threading
+from collections import OrderedDict
 from datetime import datetime
 
+from db_pool import get_pool
+
+try:
+    import orjson
+    
+    def _dumps(obj):
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+    
+    _loads = orjson.loads
+except ImportError:
+    # orjson is optional - the stdlib encoder produces the same compact output
+    def _dumps(obj):
+        return json.dumps(obj, separators=(',', ':'), ensure_ascii=False)
+    
+    _loads = json.loads
+
+# Profile rows are kept this long; writes through this manager evict immediately
+PROFILE_CACHE_SIZE = 4096
+PROFILE_CACHE_TTL = 60  # seconds
+
+GET_PROFILE_SQL = 'SELECT * FROM vendor_profiles WHERE vendor_id = ?'
+
+# (predicate on the parsed profile, need it produces), evaluated in order. Actions are
+# stored as tuples and handed to callers as fresh lists, so no caller can edit the table
+NEED_RULES = (
+    # Analyze budget constraints
+    (lambda profile: profile['budget'] < 1000, {
+        'category': 'funding',
+        'priority': 'high',
+        'description': 'Low budget detected. Consider fundraising options.',
+        'actions': ('explore_grants', 'create_pitch', 'seek_partnerships')
+    }),
+    # Analyze target audience
+    (lambda profile: len(profile['target_audience']) < 3, {
+        'category': 'marketing',
+        'priority': 'medium',
+        'description': 'Target audience definition is limited.',
+        'actions': ('audience_research', 'competitor_analysis', 'create_buyer_personas')
+    }),
+    # Analyze goals
+    (lambda profile: 'increase_sales' in profile['goals'], {
+        'category': 'advertising',
+        'priority': 'high',
+        'description': 'Goal: Increase sales. Launch targeted ad campaigns.',
+        'actions': ('create_google_ads', 'setup_facebook_ads', 'optimize_landing_pages')
+    }),
+    (lambda profile: 'brand_awareness' in profile['goals'], {
+        'category': 'content',
+        'priority': 'medium',
+        'description': 'Goal: Brand awareness. Develop content strategy.',
+        'actions': ('content_calendar', 'social_media_plan', 'influencer_outreach')
+    }),
+)
+
+def _parse_profile(row):
+    """Profile dict with its JSON fields parsed into fresh objects"""
+    profile = dict(row)
+    profile['target_audience'] = _loads(profile['target_audience'])
+    profile['goals'] = _loads(profile['goals'])
+    profile['constraints'] = _loads(profile['constraints'])
+    return profile
+
 class VendorProfileManager:
     def __init__(self, db_path='platform.db'):
         self.db_path = db_path
+        self.pool = get_pool(db_path)
+        self._profile_cache = OrderedDict()  # vendor_id -> (expires_at, profile)
+        self._cache_lock = threading.Lock()
     
     def create_vendor_profile(self, user_id, profile_data):
         """Create a new vendor profile"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT INTO vendor_profiles 
-            (user_id, business_name, business_type, industry, location, 
-             website, description, target_audience, budget, goals, constraints)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            user_id,
-            profile_data.get('business_name'),
-            profile_data.get('business_type'),
-            profile_data.get('industry'),
-            profile_data.get('location'),
-            profile_data.get('website'),
-            profile_data.get('description'),
-            json.dumps(profile_data.get('target_audience', [])),
-            profile_data.get('budget', 0),
-            json.dumps(profile_data.get('goals', [])),
-            json.dumps(profile_data.get('constraints', {}))
-        ))
-        
-        vendor_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
-        
+        with self.pool.acquire() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute('''
+                INSERT INTO vendor_profiles 
+                (user_id, business_name, business_type, industry, location, 
+                 website, description, target_audience, budget, goals, constraints)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (
+                user_id,
+                profile_data.get('business_name'),
+                profile_data.get('business_type'),
+                profile_data.get('industry'),
+                profile_data.get('location'),
+                profile_data.get('website'),
+                profile_data.get('description'),
+                _dumps(profile_data.get('target_audience', [])),
+                profile_data.get('budget', 0),
+                _dumps(profile_data.get('goals', [])),
+                _dumps(profile_data.get('constraints', {}))
+            ))
+            
+            vendor_id = cursor.lastrowid
+        
+        self._evict_profile(vendor_id)
         return vendor_id
     
     def get_vendor_profile(self, vendor_id):
         """Retrieve vendor profile"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
+        now = time.monotonic()
+        with self._cache_lock:
+            cached = self._profile_cache.get(vendor_id)
+            if cached and cached[0] > now:
+                self._profile_cache.move_to_end(vendor_id)
+                return _parse_profile(cached[1])
         
-        cursor.execute('SELECT * FROM vendor_profiles WHERE vendor_id = ?', (vendor_id,))
-        profile = cursor.fetchone()
+        with self.pool.acquire() as conn:
+            profile = conn.execute(GET_PROFILE_SQL, (vendor_id,)).fetchone()
         
-        if profile:
-            profile_dict = dict(profile)
-            # Parse JSON fields
-            profile_dict['target_audience'] = json.loads(profile_dict['target_audience'])
-            profile_dict['goals'] = json.loads(profile_dict['goals'])
-            profile_dict['constraints'] = json.loads(profile_dict['constraints'])
+        if not profile:
+            return None
         
-        conn.close()
-        return profile_dict if profile else None
+        # The row is cached with its JSON fields still as text, so every caller parses
+        # its own lists and dicts and none can mutate another's copy
+        row = dict(profile)
+        with self._cache_lock:
+            self._profile_cache[vendor_id] = (now + PROFILE_CACHE_TTL, row)
+            self._profile_cache.move_to_end(vendor_id)
+            if len(self._profile_cache) > PROFILE_CACHE_SIZE:
+                self._profile_cache.popitem(last=False)
+        return _parse_profile(row)
+    
+    def _evict_profile(self, vendor_id):
+        """Drop a cached profile after a write"""
+        with self._cache_lock:
+            self._profile_cache.pop(vendor_id, None)
     
     def update_vendor_profile(self, vendor_id, updates):
         """Update vendor profile"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        update_fields = []
-        values = []
-        
-        if 'business_name' in updates:
-            update_fields.append('business_name = ?')
-            values.append(updates['business_name'])
-        
-        if 'target_audience' in updates:
-            update_fields.append('target_audience = ?')
-            values.append(json.dumps(updates['target_audience']))
-        
-        if 'goals' in updates:
-            update_fields.append('goals = ?')
-            values.append(json.dumps(updates['goals']))
-        
-        if 'budget' in updates:
-            update_fields.append('budget = ?')
-            values.append(updates['budget'])
-        
-        if update_fields:
-            values.append(vendor_id)
-            query = f'''
-                UPDATE vendor_profiles 
-                SET {', '.join(update_fields)}
-                WHERE vendor_id = ?
-            '''
-            cursor.execute(query, values)
-            conn.commit()
-        
-        conn.close()
+        with self.pool.acquire() as conn:
+            cursor = conn.cursor()
+            
+            update_fields = []
+            values = []
+            
+            if 'business_name' in updates:
+                update_fields.append('business_name = ?')
+                values.append(updates['business_name'])
+            
+            if 'target_audience' in updates:
+                update_fields.append('target_audience = ?')
+                values.append(_dumps(updates['target_audience']))
+            
+            if 'goals' in updates:
+                update_fields.append('goals = ?')
+                values.append(_dumps(updates['goals']))
+            
+            if 'budget' in updates:
+                update_fields.append('budget = ?')
+                values.append(updates['budget'])
+            
+            if update_fields:
+                values.append(vendor_id)
+                query = f'''
+                    UPDATE vendor_profiles 
+                    SET {', '.join(update_fields)}
+                    WHERE vendor_id = ?
+                '''
+                cursor.execute(query, values)
+        
+        self._evict_profile(vendor_id)
         return True
     
     def analyze_vendor_needs(self, vendor_id):
@@ -100,42 +177,5 @@ class VendorProfileManager:
         if not profile:
             return None
         
-        needs = []
-        
-        # Analyze budget constraints
-        if profile['budget'] < 1000:
-            needs.append({
-                'category': 'funding',
-                'priority': 'high',
-                'description': 'Low budget detected. Consider fundraising options.',
-                'actions': ['explore_grants', 'create_pitch', 'seek_partnerships']
-            })
-        
-        # Analyze target audience
-        if len(profile['target_audience']) < 3:
-            needs.append({
-                'category': 'marketing',
-                'priority': 'medium',
-                'description': 'Target audience definition is limited.',
-                'actions': ['audience_research', 'competitor_analysis', 'create_buyer_personas']
-            })
-        
-        # Analyze goals
-        goals = profile['goals']
-        if 'increase_sales' in goals:
-            needs.append({
-                'category': 'advertising',
-                'priority': 'high',
-                'description': 'Goal: Increase sales. Launch targeted ad campaigns.',
-                'actions': ['create_google_ads', 'setup_facebook_ads', 'optimize_landing_pages']
-            })
-        
-        if 'brand_awareness' in goals:
-            needs.append({
-                'category': 'content',
-                'priority': 'medium',
-                'description': 'Goal: Brand awareness. Develop content strategy.',
-                'actions': ['content_calendar', 'social_media_plan', 'influencer_outreach']
-            })
-        
-        return needs
\ No newline at end of file
+        return [{**need, 'actions': list(need['actions'])}
+                for applies, need in NEED_RULES if applies(profile)]
\ No newline at end of file